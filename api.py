@@ -0,0 +1,276 @@
+import argparse
+import gzip
+import json
+import logging
+import math
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+
+import database
+from filters import ranked_search
+
+# Read-only JSON API over the same catalog as the Streamlit pages, for the mobile
+# client and crawlers. Runs as its own process next to `streamlit run`:
+#
+#   python api.py --port 8600
+#
+#   GET /v1/search?q=lang&media=film&page=1&per_page=20
+#   GET /v1/films/facets/genres?prefix=dr&page=1&per_page=50
+#   GET /v1/films/<id>          GET /v1/audiobooks/<id>
+#
+# The catalog comes from database.get_catalog() (with SELIRA_CATALOG_STORE it
+# attaches to the published store), and the watcher swaps in new versions. Every
+# successful response carries an ETag for the catalog version and body encoding; a
+# matching If-None-Match gets a 304, but only once the request has been routed and
+# validated, so bad requests still get their 404/400. Bodies are gzipped when the
+# client accepts it. Rendered bodies are kept in a small LRU keyed by catalog
+# version, so repeated requests skip the JSON work.
+
+MEDIA_PATHS = {'films': 'film', 'audiobooks': 'audiobook'}
+FACET_COLUMNS = {'film': database.FILM_FACET_COLUMNS, 'audiobook': database.AUDIOBOOK_FACET_COLUMNS}
+SUMMARY_FIELDS = {
+    'film': ['id', 'title', 'year', 'genres', 'director', 'imdb_rating', 'poster', 'provider'],
+    'audiobook': ['id', 'title', 'author', 'narrator', 'genres', 'goodreads_rating', 'duration_seconds',
+                  'chapter_count', 'cover', 'provider'],
+}
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+GZIP_MIN_BYTES = 1024
+MAX_CACHED_RESPONSES = 2000
+
+logger = logging.getLogger("selira.api")
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+_lock = threading.Lock()
+_response_cache = OrderedDict()
+_facet_cache = {}
+
+def _cache_get(key):
+    with _lock:
+        body = _response_cache.get(key)
+        if body is not None:
+            _response_cache.move_to_end(key)
+        return body
+
+def _cache_put(key, body):
+    with _lock:
+        _response_cache[key] = body
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > MAX_CACHED_RESPONSES:
+            _response_cache.popitem(last=False)
+
+# Function to turn a catalog value (NumPy/Arrow scalar, NaN, NA) into plain JSON
+def _jsonable(value):
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    return value
+
+def _summaries(media, frame):
+    fields = [field for field in SUMMARY_FIELDS[media] if field in frame.columns]
+    return [{'media': media, **{field: _jsonable(value) for field, value in record.items()}}
+            for record in frame[fields].to_dict('records')]
+
+def _page_params(params):
+    try:
+        page = max(1, int(params.get('page', 1)))
+        per_page = min(MAX_PER_PAGE, max(1, int(params.get('per_page', DEFAULT_PER_PAGE))))
+    except ValueError:
+        raise ApiError(400, "page dan per_page harus berupa angka")
+    return page, per_page
+
+def _paginate(items, params):
+    page, per_page = _page_params(params)
+    start = (page - 1) * per_page
+    return {'page': page, 'per_page': per_page, 'total': len(items)}, items[start:start + per_page]
+
+def search(catalog, params):
+    query = params.get('q', '')
+    media = params.get('media', 'all')
+    if media not in ('all', 'film', 'audiobook'):
+        raise ApiError(400, "media harus all, film atau audiobook")
+    index = catalog.search_index
+    if query.strip():
+        hits = ranked_search(index, query, None)
+    else:
+        hits = np.arange(len(index['rows']))
+    if media != 'all':
+        hits = hits[index['media'][hits] == database.SEARCH_MEDIA.index(media)]
+    paging, hits = _paginate(hits, params)
+    # Materialize the page with one iloc per media, not one per hit
+    results = [None] * len(hits)
+    for code, hit_media in enumerate(database.SEARCH_MEDIA):
+        slots = np.flatnonzero(index['media'][hits] == code)
+        if slots.size:
+            frame = catalog.films if hit_media == 'film' else catalog.audiobooks
+            for slot, summary in zip(slots, _summaries(hit_media, frame.iloc[index['rows'][hits[slots]]])):
+                results[slot] = summary
+    return {'query': query, 'media': media, **paging, 'results': results}
+
+# Function to count every value of a facet column, most frequent first (cached per catalog version)
+def _facet_counts(catalog, media, column):
+    key = (catalog.version, media, column)
+    counts = _facet_cache.get(key)
+    if counts is None:
+        columns = catalog.film_columns if media == 'film' else catalog.audiobook_columns
+        tokens = columns.get(f'{column}_tokens')
+        if tokens is None or len(tokens) == 0:
+            counts = []
+        else:
+            value_counts = pc.value_counts(pc.list_flatten(tokens))
+            counts = sorted(zip(value_counts.field('values').to_pylist(),
+                                value_counts.field('counts').to_pylist()), key=lambda pair: (-pair[1], pair[0]))
+        with _lock:
+            # Only the live version is worth keeping
+            for old in [old for old in _facet_cache if old[0] != catalog.version]:
+                del _facet_cache[old]
+            _facet_cache[key] = counts
+    return counts
+
+def facets(catalog, media, column, params):
+    if column not in FACET_COLUMNS[media]:
+        raise ApiError(404, f"Facet tidak dikenal: {column}")
+    counts = _facet_counts(catalog, media, column)
+    prefix = params.get('prefix', '').strip().lower()
+    if prefix:
+        counts = [pair for pair in counts if pair[0].lower().startswith(prefix)]
+    paging, counts = _paginate(counts, params)
+    return {'media': media, 'facet': column, 'prefix': prefix, **paging,
+            'values': [{'value': value, 'count': count} for value, count in counts]}
+
+def item(catalog, media, raw_id):
+    item_id = catalog.resolve_id(media, raw_id)
+    if item_id is None:
+        raise ApiError(404, f"{media} tidak ditemukan: {raw_id}")
+    row = catalog.get_film(item_id) if media == 'film' else catalog.get_audiobook(item_id)
+    result = {'media': media, **{col: _jsonable(value) for col, value in row.items()}}
+    for column in database.LONG_TEXT_COLUMNS[media]:
+        result[column] = catalog.get_text(media, item_id, column)
+    if media == 'audiobook':
+        result['chapters'] = [{'seconds': seconds, 'title': title, 'label': label}
+                              for seconds, title, label in catalog.chapters.get(item_id, ())]
+    result['similar'] = _summaries(media, catalog.similar(media, item_id, limit=5))
+    return result
+
+# Function to route a request path to its handler; returns the response document
+def route(catalog, path, params):
+    parts = [unquote(part) for part in path.split('/') if part]
+    if parts[:1] != ['v1'] or len(parts) < 2:
+        raise ApiError(404, "Endpoint tidak ditemukan")
+    if parts[1:] == ['search']:
+        return search(catalog, params)
+    media = MEDIA_PATHS.get(parts[1])
+    if media is not None:
+        if len(parts) == 4 and parts[2] == 'facets':
+            return facets(catalog, media, parts[3], params)
+        if len(parts) == 3:
+            return item(catalog, media, parts[2])
+    raise ApiError(404, "Endpoint tidak ditemukan")
+
+# A gzip body and an identity body are different representations, so they get different tags
+def etag_for(catalog, gzipped=False):
+    encoding = "-gzip" if gzipped else ""
+    return f'"{catalog.source_version}-{catalog.version}{encoding}"'
+
+# Function to check If-None-Match against our tag (weak comparison, as RFC 9110 asks for GET)
+def etag_matches(if_none_match, etag):
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+def _encode(catalog, document, use_gzip):
+    document = {'version': catalog.version, **document}
+    body = json.dumps(document, ensure_ascii=False, default=str).encode('utf-8')
+    gzipped = use_gzip and len(body) >= GZIP_MIN_BYTES
+    if gzipped:
+        body = gzip.compress(body, compresslevel=5)
+    return body, gzipped
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "SeliraAPI/1"
+    # Headers and body go out as separate writes; with Nagle on, keep-alive clients wait on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        # One catalog version for the whole request, like one Streamlit rerun
+        catalog = database.get_catalog()
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        key = (catalog.version, self.path, use_gzip)
+        cached = _cache_get(key)
+        if cached is None:
+            # Only successful responses are cached, so a cached path has already been validated
+            url = urlsplit(self.path)
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            try:
+                document = route(catalog, url.path, params)
+            except ApiError as e:
+                body, gzipped = _encode(catalog, {'error': str(e)}, use_gzip)
+                self._send(e.status, body, None, gzipped=gzipped)
+                return
+            cached = _encode(catalog, document, use_gzip)
+            _cache_put(key, cached)
+
+        body, gzipped = cached
+        etag = etag_for(catalog, gzipped)
+        if etag_matches(self.headers.get('If-None-Match', ''), etag):
+            self._send(304, b'', etag)
+            return
+        self._send(200, body, etag, gzipped=gzipped)
+
+    def _send(self, status, body, etag, gzipped=False):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            if gzipped:
+                self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+class CatalogServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Selira catalog as a read-only JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    # Load the catalog and the merged search index before accepting requests
+    catalog = database.get_catalog()
+    catalog.search_index
+    server = CatalogServer((args.host, args.port), CatalogHandler)
+    logger.info("Katalog versi %s, melayani di http://%s:%s/v1/", catalog.version, args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from database import Provider
+
+_component = components.declare_component(
+    "audio_player",
+    path=str(Path(__file__).parent / "frontend" / "audio_player")
+)
+
+# Player with chapter navigation that seeks in the browser. It runs as a
+# fragment, so the debounced position reports only rerun the player.
+@st.fragment
+def audio_player(audiobook_id, provider, embed_base, track_id, chapters, start=0, key=None):
+    # embed_base and track_id are normalized when the catalog loads, the start offset is just appended
+    if provider == Provider.AUDIO.value:
+        src = f"{embed_base}#t={int(start)}"
+    else:
+        src = embed_base
+    if provider in (Provider.SPOTIFY.value, Provider.YOUTUBE.value) and not isinstance(track_id, str):
+        # The URL did not parse into a track: show it as a plain iframe, without seeking
+        provider = Provider.IFRAME.value
+    report = _component(
+        provider=provider,
+        src=src,
+        track_id=track_id if isinstance(track_id, str) else None,
+        chapters=[[seconds, label] for seconds, _, label in chapters],
+        start=int(start),
+        start_key=f"{audiobook_id}-{int(start)}",
+        key=key,
+        default=None
+    )
+
+    # Remember the last reported position so reopening the audiobook resumes there
+    if report and 'position' in report:
+        st.session_state.setdefault('audiobook_positions', {})[audiobook_id] = report['position']
@@ -0,0 +1,143 @@
+import pandas as pd
+
+# Dictionary mapping country names to flag emojis
+COUNTRY_TO_FLAG = {
+    'USA': '🇺🇸', 'United States': '🇺🇸', 'US': '🇺🇸',
+    'UK': '🇬🇧', 'United Kingdom': '🇬🇧', 'Great Britain': '🇬🇧',
+    'France': '🇫🇷', 'FR': '🇫🇷',
+    'Japan': '🇯🇵', 'JP': '🇯🇵',
+    'Italy': '🇮🇹', 'IT': '🇮🇹',
+    'Germany': '🇩🇪', 'DE': '🇩🇪',
+    'Canada': '🇨🇦', 'CA': '🇨🇦',
+    'China': '🇨🇳', 'CN': '🇨🇳',
+    'Australia': '🇦🇺', 'AU': '🇦🇺',
+    'Spain': '🇪🇸', 'ES': '🇪🇸',
+    'India': '🇮🇳', 'IN': '🇮🇳',
+    'Korea': '🇰🇷', 'South Korea': '🇰🇷', 'KR': '🇰🇷',
+    'Indonesia': '🇮🇩', 'ID': '🇮🇩',
+    'Brazil': '🇧🇷', 'BR': '🇧🇷',
+    'Russia': '🇷🇺', 'RU': '🇷🇺',
+    'Mexico': '🇲🇽', 'MX': '🇲🇽',
+    # Add more countries as needed
+}
+
+# Dictionary mapping language names to flag emojis
+LANGUAGE_TO_FLAG = {
+    'English': '🇬🇧', 'Inggris': '🇬🇧',
+    'Indonesian': '🇮🇩', 'Indonesia': '🇮🇩',
+    'French': '🇫🇷', 'Prancis': '🇫🇷',
+    'Japanese': '🇯🇵', 'Jepang': '🇯🇵',
+    'German': '🇩🇪', 'Jerman': '🇩🇪',
+    'Spanish': '🇪🇸', 'Spanyol': '🇪🇸',
+    'Chinese': '🇨🇳', 'Mandarin': '🇨🇳',
+    'Korean': '🇰🇷', 'Korea': '🇰🇷',
+    'Russian': '🇷🇺', 'Rusia': '🇷🇺',
+    'Arabic': '🇸🇦', 'Arab': '🇸🇦',
+    # Add more languages as needed
+}
+
+# Function to turn a comma separated field into flag emojis
+def to_flags(value, mapping):
+    flags = ''
+    if value != 'Tidak tersedia':
+        for c in [c.strip() for c in str(value).split(',')]:
+            if c in mapping:
+                flags += mapping[c] + ' '
+    return flags
+
+# Function to get the image url of a card, or None if it has no valid image
+def image_url(url):
+    if pd.notna(url) and str(url).startswith('http'):
+        return str(url)
+    return None
+
+# Function to format seconds as "5 j 22 m" / "9 m", or None if unknown
+def format_duration(seconds):
+    if seconds is None or pd.isna(seconds):
+        return None
+    minutes = int(round(seconds / 60))
+    return f"{minutes // 60} j {minutes % 60} m" if minutes >= 60 else f"{minutes} m"
+
+# Function to get the duration text of an audiobook, falling back to the raw cell
+def duration_text(audiobook):
+    return format_duration(audiobook.get('duration_seconds')) or str(audiobook.get('duration', 'Tidak tersedia'))
+
+# Function to get "12 bab, ± 27 m per bab", or None if the audiobook has no chapter list
+def chapter_text(audiobook):
+    count = audiobook.get('chapter_count', 0)
+    if not count or pd.isna(count):
+        return None
+    average = format_duration(audiobook.get('chapter_avg_seconds'))
+    return f"{int(count)} bab" + (f", ± {average} per bab" if average else "")
+
+# Function to build the HTML fragment of a film card
+def film_card_html(film):
+    title = film.get('title', 'Judul tidak tersedia')
+    year = film.get('year', 0)
+    year_display = year if year != 0 else 'Tidak tersedia'
+    poster_url = image_url(film.get('poster', ''))
+    imdb_rating = film.get('imdb_rating', 'N/A')
+    director = film.get('director', 'Tidak tersedia')
+    actors = film.get('actors', 'Tidak tersedia')
+    genres = film.get('genres', 'Tidak tersedia')
+    writer = film.get('writer', 'Tidak tersedia')
+    country_flag = to_flags(film.get('country', 'Tidak tersedia'), COUNTRY_TO_FLAG)
+
+    return f"""
+    <div class="film-card">
+        <div class="poster-container">
+            {'<img src="' + poster_url + '" class="film-poster" alt="' + title + '" title="' + title + '">' if poster_url else '<div style="text-align: center; color: #888;">Poster tidak tersedia</div>'}
+        </div>
+        <div class="film-title" title="{title} ({year_display})">{title} ({year_display})</div>
+        <div class="film-details">
+            <div class="film-rating">
+                <span>⭐ {imdb_rating}/10</span>
+                <span class="country-flag">{country_flag}</span>
+            </div>
+            <div><strong>Genre:</strong> {genres}</div>
+            <div><strong>Sutradara:</strong> {director}</div>
+            <div><strong>Pemeran:</strong> {actors}</div>
+            <div><strong>Penulis:</strong> {writer}</div>
+        </div>
+    </div>
+    """
+
+# Function to build the HTML fragment of an audiobook card
+def audiobook_card_html(audiobook):
+    title = audiobook.get('title', 'Judul tidak tersedia')
+    year = audiobook.get('year', 0)
+    year_display = year if year != 0 else 'Tidak tersedia'
+    cover_url = image_url(audiobook.get('cover', ''))
+    rating = audiobook.get('goodreads_rating', 'N/A')
+    author = audiobook.get('author', 'Tidak tersedia')
+    narrator = audiobook.get('narrator', 'Tidak tersedia')
+    genres = audiobook.get('genres', 'Tidak tersedia')
+    duration = duration_text(audiobook)
+    chapters = chapter_text(audiobook)
+    language_flag = to_flags(audiobook.get('language', 'Tidak tersedia'), LANGUAGE_TO_FLAG)
+
+    return f"""
+    <div class="audiobook-card">
+        <div class="cover-container">
+            {'<img src="' + cover_url + '" class="audiobook-cover" alt="' + title + '" title="' + title + '">' if cover_url else '<div style="text-align: center; color: #888;">Cover tidak tersedia</div>'}
+        </div>
+        <div class="audiobook-title" title="{title} ({year_display})">{title} ({year_display})</div>
+        <div class="audiobook-details">
+            <div class="audiobook-rating">
+                <span>⭐ {rating}/5</span>
+                <span class="language-flag">{language_flag}</span>
+            </div>
+            <div><strong>Durasi:</strong> {duration}</div>
+            {f'<div><strong>Bab:</strong> {chapters}</div>' if chapters else ''}
+            <div><strong>Genre:</strong> {genres}</div>
+            <div><strong>Penulis:</strong> {author}</div>
+            <div><strong>Narator:</strong> {narrator}</div>
+        </div>
+    </div>
+    """
+
+# Media specific card settings: card builder and image column
+CARD_BUILDERS = {
+    'film': (film_card_html, 'poster'),
+    'audiobook': (audiobook_card_html, 'cover'),
+}
@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import database
+
+# Shared-memory catalog for multi-worker deployments.
+#
+# One loader process compiles the workbook and publishes the catalog as a
+# versioned directory of memory-mappable files:
+#
+#   <store>/CURRENT                       version number of the live catalog
+#   <store>/v<N>/film.arrow               frames, Arrow IPC
+#   <store>/v<N>/film_columns.arrow       search text, facet values and tokens
+#   <store>/v<N>/film_<column>.npy        numeric filter columns
+#   <store>/v<N>/film_texts.bin           compressed long text columns (database.TextStore)
+#   <store>/v<N>/film.neighbors.npy       "Mirip dengan ini" neighbor positions and scores
+#   <store>/v<N>/film.ids.arrow           id -> row map: sorted ids, and film.id_rows.npy
+#   <store>/v<N>/film.hashes.npy          row hashes for incremental reloads
+#   <store>/v<N>/film.spans.<column>.npy  offsets into film_texts.bin
+#   <store>/v<N>/chapters.*               chapter tables, flattened (database.StoredChapters)
+#   <store>/v<N>/chapter_index.*          compacted chapter index (database.StoredChapterIndex)
+#   <store>/v<N>/aggregates.pickle        Home aggregates (a few small frames)
+#
+# Streamlit workers started with SELIRA_CATALOG_STORE=<store> attach to the
+# current version read-only (the OS page cache holds a single copy for all
+# workers) and swap to a new version as soon as CURRENT changes. Every index is
+# a flat Arrow/NumPy file that is memory-mapped like the columns; only the Home
+# aggregates are unpickled, so a worker keeps almost no private catalog memory.
+
+STORE_ENV = "SELIRA_CATALOG_STORE"
+MEDIA = ['film', 'audiobook']
+KEEP_VERSIONS = 3
+
+_attached = None
+_attach_lock = threading.Lock()
+
+def get_store_dir():
+    store_dir = os.environ.get(STORE_ENV)
+    return Path(store_dir) if store_dir else None
+
+def current_version(store_dir):
+    try:
+        return int((Path(store_dir) / "CURRENT").read_text().strip())
+    except (OSError, ValueError):
+        return 0
+
+def _frame_attribute(media):
+    return 'films' if media == 'film' else 'audiobooks'
+
+# Arrow needs one type per column, mixed object columns are stored as text
+def _frame_to_arrow(df):
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) not in ('string', 'empty'):
+            df[col] = df[col].map(lambda v: str(v) if pd.notna(v) else None)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def _write_table(table, path):
+    with pa.OSFile(str(path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+def _read_table(path):
+    return pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+def _column(table, name):
+    chunks = table.column(name)
+    return chunks.chunk(0) if chunks.num_chunks == 1 else chunks.combine_chunks()
+
+# Arrow needs one type per array: ids of mixed types are stored as text (see database.SortedKeys)
+def _key_array(keys):
+    try:
+        return pa.array(keys)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([str(key) for key in keys], type=pa.string())
+
+# Function to write sorted keys (database.SortedKeys); returns the original positions in key order
+def _write_keys(keys, path):
+    array, order, as_text = database.SortedKeys.build(keys)
+    _write_table(pa.table({'key': array}, metadata={'as_text': '1' if as_text else '0'}), path)
+    return order
+
+def _read_keys(path):
+    table = _read_table(path)
+    return database.SortedKeys(_column(table, 'key'), as_text=table.schema.metadata.get(b'as_text') == b'1')
+
+def _write_chapters(chapters, tmp):
+    keys = list(chapters)
+    tables = [chapters[keys[i]] for i in _write_keys(keys, tmp / "chapters.keys.arrow")]
+    offsets = np.zeros(len(tables) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(table) for table in tables])
+    np.save(tmp / "chapters.offsets.npy", offsets)
+    np.save(tmp / "chapters.seconds.npy", np.array([row[0] for table in tables for row in table], dtype=np.int64))
+    _write_table(pa.table({
+        'title': pa.array([row[1] for table in tables for row in table], type=pa.string()),
+        'label': pa.array([row[2] for table in tables for row in table], type=pa.string()),
+    }), tmp / "chapters.arrow")
+
+def _read_chapters(path):
+    table = _read_table(path / "chapters.arrow")
+    return database.StoredChapters(
+        _read_keys(path / "chapters.keys.arrow"),
+        np.load(path / "chapters.offsets.npy", mmap_mode='r'),
+        np.load(path / "chapters.seconds.npy", mmap_mode='r'),
+        _column(table, 'title'), _column(table, 'label'))
+
+def _write_chapter_index(index, tmp):
+    # Published compacted, so entry numbers are dense and there is nothing dead to map
+    if index.dead:
+        index = index.compacted()
+    entries = index.entries[:index.size]
+    _write_table(pa.table({
+        'id': _key_array([entry[0] for entry in entries]),
+        'title': pa.array([entry[2] for entry in entries], type=pa.string()),
+    }), tmp / "chapter_index.entries.arrow")
+    np.save(tmp / "chapter_index.seconds.npy", np.array([entry[1] for entry in entries], dtype=np.int64))
+    postings = [index.postings[token] for token in index.vocabulary]
+    offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(entries) for entries in postings])
+    _write_table(pa.table({'key': pa.array(index.vocabulary, type=pa.string())}, metadata={'as_text': '0'}),
+                 tmp / "chapter_index.vocabulary.arrow")
+    np.save(tmp / "chapter_index.offsets.npy", offsets)
+    np.save(tmp / "chapter_index.postings.npy",
+            np.concatenate(postings) if postings else np.zeros(0, dtype=np.int32))
+
+def _read_chapter_index(path):
+    entries = _read_table(path / "chapter_index.entries.arrow")
+    return database.StoredChapterIndex(
+        _column(entries, 'id'),
+        np.load(path / "chapter_index.seconds.npy", mmap_mode='r'),
+        _column(entries, 'title'),
+        _read_keys(path / "chapter_index.vocabulary.arrow"),
+        np.load(path / "chapter_index.offsets.npy", mmap_mode='r'),
+        np.load(path / "chapter_index.postings.npy", mmap_mode='r'))
+
+def _write_current(store_dir, version):
+    tmp = store_dir / "CURRENT.tmp"
+    tmp.write_text(str(version))
+    os.replace(tmp, store_dir / "CURRENT")
+
+def _prune(store_dir, version):
+    # Workers that still map an old version keep working: unlinked files stay mapped
+    for path in store_dir.glob("v*"):
+        try:
+            old = int(path.name[1:])
+        except ValueError:
+            continue
+        if old <= version - KEEP_VERSIONS:
+            shutil.rmtree(path, ignore_errors=True)
+
+# Function to publish a compiled catalog as the next store version
+def publish(catalog, store_dir):
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    version = current_version(store_dir) + 1
+    tmp = store_dir / f".v{version}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+
+    for media in MEDIA:
+        _write_table(_frame_to_arrow(getattr(catalog, _frame_attribute(media))), tmp / f"{media}.arrow")
+        columns = getattr(catalog, f"{media}_columns")
+        arrow_columns = {name: values for name, values in columns.items() if isinstance(values, pa.Array)}
+        _write_table(pa.table(arrow_columns) if arrow_columns else pa.table({}), tmp / f"{media}_columns.arrow")
+        for name, values in columns.items():
+            if isinstance(values, np.ndarray):
+                np.save(tmp / f"{media}_{name}.npy", values)
+        (tmp / f"{media}_texts.bin").write_bytes(getattr(catalog, f"{media}_texts").payload())
+        np.save(tmp / f"{media}.neighbors.npy", getattr(catalog, f"{media}_neighbors"))
+        np.save(tmp / f"{media}.neighbor_scores.npy", getattr(catalog, f"{media}_neighbor_scores"))
+        rows = getattr(catalog, f"{media}_rows")
+        order = _write_keys(list(rows), tmp / f"{media}.ids.arrow")
+        np.save(tmp / f"{media}.id_rows.npy", np.array(list(rows.values()), dtype=np.int32)[order])
+        np.save(tmp / f"{media}.hashes.npy", getattr(catalog, f"{media}_hashes"))
+        for column, spans in getattr(catalog, f"{media}_texts").spans.items():
+            np.save(tmp / f"{media}.spans.{column}.npy", spans)
+
+    _write_chapters(catalog.chapters, tmp)
+    _write_chapter_index(catalog.chapter_index, tmp)
+    with open(tmp / "aggregates.pickle", 'wb') as f:
+        pickle.dump(catalog.aggregates, f, protocol=pickle.HIGHEST_PROTOCOL)
+    (tmp / "meta.json").write_text(json.dumps({
+        'version': version,
+        'source_version': catalog.source_version,
+        'published_at': time.time(),
+        'source_columns': {media: list(map(str, getattr(catalog, f"{media}_source_columns"))) for media in MEDIA},
+        'text_columns': {media: list(getattr(catalog, f"{media}_texts").spans) for media in MEDIA},
+    }))
+
+    # The version directory only becomes visible once it is complete
+    os.rename(tmp, store_dir / f"v{version}")
+    _write_current(store_dir, version)
+    _prune(store_dir, version)
+    return version
+
+def _load(store_dir, version):
+    path = Path(store_dir) / f"v{version}"
+    meta = json.loads((path / "meta.json").read_text())
+    parts = {'version': version, 'source_version': meta['source_version']}
+    for media in MEDIA:
+        frame = _read_table(path / f"{media}.arrow").to_pandas(types_mapper=pd.ArrowDtype)
+        parts[_frame_attribute(media)] = frame
+        columns = {}
+        table = _read_table(path / f"{media}_columns.arrow")
+        for name in table.column_names:
+            columns[name] = _column(table, name)
+        for npy in path.glob(f"{media}_*.npy"):
+            columns[npy.stem[len(media) + 1:]] = np.load(npy, mmap_mode='r')
+        parts[f"{media}_columns"] = columns
+        parts[f"{media}_neighbors"] = np.load(path / f"{media}.neighbors.npy", mmap_mode='r')
+        parts[f"{media}_neighbor_scores"] = np.load(path / f"{media}.neighbor_scores.npy", mmap_mode='r')
+        parts[f"{media}_rows"] = database.StoredRows(_read_keys(path / f"{media}.ids.arrow"),
+                                                     np.load(path / f"{media}.id_rows.npy", mmap_mode='r'))
+        parts[f"{media}_hashes"] = np.load(path / f"{media}.hashes.npy", mmap_mode='r')
+        parts[f"{media}_source_columns"] = meta['source_columns'][media]
+        text_path = path / f"{media}_texts.bin"
+        # np.memmap cannot map an empty file
+        data = np.memmap(text_path, dtype=np.uint8, mode='r') if text_path.stat().st_size else b''
+        spans = {column: np.load(path / f"{media}.spans.{column}.npy", mmap_mode='r')
+                 for column in meta['text_columns'][media]}
+        parts[f"{media}_texts"] = database.TextStore(data, spans)
+    parts['chapters'] = _read_chapters(path)
+    parts['chapter_index'] = _read_chapter_index(path)
+    with open(path / "aggregates.pickle", 'rb') as f:
+        parts['aggregates'] = pickle.load(f)
+    return database.Catalog.from_parts(**parts)
+
+# Function to get the currently published catalog, or None if nothing is published yet
+def attach(store_dir):
+    global _attached
+    version = current_version(store_dir)
+    if version == 0:
+        return _attached
+    attached = _attached
+    if attached is not None and attached.version == version:
+        return attached
+
+    with _attach_lock:
+        if _attached is None or _attached.version != version:
+            try:
+                _attached = _load(store_dir, version)
+            except (OSError, ValueError, KeyError, pickle.UnpicklingError, pa.ArrowInvalid):
+                # A version pruned or replaced while attaching (or published in an older
+                # layout); keep serving the old one
+                pass
+        return _attached
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish the compiled catalog for Streamlit workers")
+    parser.add_argument("store_dir", nargs='?', default=os.environ.get(STORE_ENV))
+    parser.add_argument("--watch", type=float, default=0,
+                        help="check the workbook every N seconds and republish when it changes")
+    args = parser.parse_args()
+    if not args.store_dir:
+        parser.error(f"store_dir or {STORE_ENV} is required")
+
+    catalog = None
+    attempted = None
+    source_version = database.get_data_version()
+    while True:
+        # A failed read is retried once the workbook changes again, not every interval
+        if source_version != attempted and (catalog is None or source_version != catalog.source_version):
+            attempted = source_version
+            # Same build as the in-process watcher: only the changed rows are re-indexed, and
+            # a failed read (missing workbook, file caught mid-save) keeps the previous catalog
+            built = database.build_catalog(catalog, source_version)
+            if built is None or built is catalog:
+                print(f"Workbook tidak bisa dibaca, {args.store_dir} tidak diubah", file=sys.stderr, flush=True)
+            else:
+                catalog = built
+                version = publish(catalog, args.store_dir)
+                print(f"Katalog versi {version} dipublikasikan ke {args.store_dir}", flush=True)
+        if not args.watch:
+            break
+        # Read the workbook only once it has stopped changing
+        source_version = database.wait_until_settled(args.watch)
+    if catalog is None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
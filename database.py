@@ -1,38 +1,125 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
+import hashlib
+import multiprocessing
 import os
+import re
+import threading
+import time
+import traceback
+import tracemalloc
+import zlib
+from bisect import bisect_left, insort
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from functools import cached_property
 from pathlib import Path
 
+from filters import sorted_index
+from recommendations import FILM_SIMILARITY_COLUMNS, AUDIOBOOK_SIMILARITY_COLUMNS, build_neighbors, update_neighbors
+from sheet_reader import SHEET_NAMES, read_sheet
+
+def find_excel_path():
+    # Cari file Excel di beberapa lokasi
+    excel_path = Path(__file__).parent / "data_hiburan.xlsx"
+    if not excel_path.exists():
+        excel_path = Path.cwd() / "data_hiburan.xlsx"
+    return excel_path
+
+# Folder workbook tambahan (mis. satu per sumber atau per bulan) di samping data_hiburan.xlsx
+def find_catalog_dir():
+    catalog_dir = os.environ.get("SELIRA_CATALOG_DIR")
+    return Path(catalog_dir) if catalog_dir else find_excel_path().parent / "katalog"
+
+# Semua workbook katalog: data_hiburan.xlsx lalu isi folder katalog urut nama
+def find_workbooks():
+    workbooks = []
+    excel_path = find_excel_path()
+    if excel_path.exists():
+        workbooks.append(excel_path)
+    catalog_dir = find_catalog_dir()
+    if catalog_dir.is_dir():
+        # Lewati file kunci "~$..." yang dibuat Excel selama file dibuka
+        workbooks.extend(sorted(path for path in catalog_dir.glob("*.xlsx") if not path.name.startswith("~$")))
+    return workbooks
+
+# Versi data dari nama dan waktu modifikasi semua workbook, untuk kunci cache
+def get_data_version():
+    stamps = []
+    for path in find_workbooks():
+        try:
+            stamps.append(f"{path}:{path.stat().st_mtime_ns}")
+        except OSError:
+            pass
+    if not stamps:
+        return 0
+    return int.from_bytes(hashlib.blake2b("\n".join(stamps).encode(), digest_size=7).digest(), 'big')
+
+def _available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+# Jumlah proses untuk membaca sheet; 1 = baca berurutan di proses ini
+LOAD_WORKERS = int(os.environ.get("SELIRA_LOAD_WORKERS", _available_cores()))
+# Memulai pool (forkserver, impor pandas di tiap worker) makan sekitar 0.8 dtk. Di bawah
+# ukuran total workbook ini membaca berurutan di proses ini lebih cepat.
+PARALLEL_LOAD_BYTES = int(os.environ.get("SELIRA_PARALLEL_LOAD_BYTES", 4 * 1024 * 1024))
+
+def _file_size(path):
+    try:
+        return Path(path).stat().st_size
+    except OSError:
+        return 0
+
+# Function to read (workbook, sheet) pairs, in parallel on a process pool when the
+# workbooks are large enough to pay for starting it and there are cores for it
+def _read_sheets(tasks):
+    workers = min(LOAD_WORKERS, len(tasks))
+    if workers <= 1 or sum(_file_size(path) for path in {path for path, _ in tasks}) < PARALLEL_LOAD_BYTES:
+        return [read_sheet(path, kind) for path, kind in tasks]
+    # forkserver: worker di-fork dari proses bersih yang sudah mengimpor pandas,
+    # bukan dari server Streamlit yang punya banyak thread
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(method)
+    if method == 'forkserver':
+        context.set_forkserver_preload(['sheet_reader'])
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(read_sheet, *zip(*tasks)))
+
+# Gabungkan sheet sejenis dari beberapa workbook; baris dengan id yang sama
+# diambil dari workbook yang paling belakang
+def _merge_sheets(frames):
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    df = pd.concat(frames, ignore_index=True)
+    if 'id' in df.columns:
+        duplicated = df['id'].notna() & df.duplicated(subset='id', keep='last')
+        df = df[~duplicated].reset_index(drop=True)
+    return df
+
 def load_excel_data():
     try:
-        # Cari file Excel di beberapa lokasi
-        excel_path = Path(__file__).parent / "data_hiburan.xlsx"
-        if not excel_path.exists():
-            excel_path = Path.cwd() / "data_hiburan.xlsx"
+        workbooks = find_workbooks()
         
-        if not excel_path.exists():
-            st.error(f"File tidak ditemukan di: {excel_path}")
+        if not workbooks:
+            st.error(f"File tidak ditemukan di: {find_excel_path()}")
             return pd.DataFrame(), pd.DataFrame()
 
-        # Baca file Excel
-        excel_data = pd.ExcelFile(excel_path)
+        # Baca sheet film dan audiobook dari semua workbook (paralel bila cukup besar)
+        tasks = [(str(path), kind) for path in workbooks for kind in SHEET_NAMES]
+        frames = _read_sheets(tasks)
         
-        # Baca data film - coba beberapa kemungkinan nama sheet
-        sheet_names = ['films', 'Films', 'film', 'Film', 'Sheet1']
-        films_df = pd.DataFrame()
-        
-        for sheet in sheet_names:
-            if sheet in excel_data.sheet_names:
-                films_df = pd.read_excel(excel_data, sheet)
-                # Hapus kolom 'error' jika ada
-                if 'error' in films_df.columns:
-                    films_df = films_df.drop(columns=['error'])
-                break
-                
-        # Baca data audiobook (jika ada)
-        audiobooks_df = pd.DataFrame()
-        if 'audiobooks' in excel_data.sheet_names:
-            audiobooks_df = pd.read_excel(excel_data, 'audiobooks')
+        films_df = _merge_sheets([df for (_, kind), df in zip(tasks, frames) if kind == 'films'])
+        audiobooks_df = _merge_sheets([df for (_, kind), df in zip(tasks, frames) if kind == 'audiobooks'])
         
         return films_df, audiobooks_df
         
@@ -40,11 +127,993 @@ def load_excel_data():
         st.error(f"Error membaca Excel: {str(e)}")
         return pd.DataFrame(), pd.DataFrame()
 
+# Function to parse timestamps from string
+def parse_timestamps(timestamp_str):
+    if not timestamp_str or pd.isna(timestamp_str):
+        return []
+    
+    # Regular expression to match timestamp patterns like "00:00:00 TITLE"
+    pattern = r'(\d{2}:\d{2}:\d{2})\s+(.+?)(?=\s+\d{2}:\d{2}:\d{2}|\Z)'
+    matches = re.findall(pattern, timestamp_str)
+    
+    # If no matches found but there's content, check if it starts with "DAFTAR ISI"
+    if not matches and "DAFTAR ISI" in timestamp_str:
+        # Split by "DAFTAR ISI" and use the pattern on the remainder
+        parts = timestamp_str.split("DAFTAR ISI", 1)
+        if len(parts) > 1:
+            matches = re.findall(pattern, parts[1])
+    
+    return matches
+
+# Function to convert HH:MM:SS to seconds
+def time_to_seconds(time_str):
+    if not time_str:
+        return 0
+    
+    parts = time_str.split(':')
+    if len(parts) == 3:
+        hours = int(parts[0])
+        minutes = int(parts[1])
+        seconds = int(parts[2])
+        return hours * 3600 + minutes * 60 + seconds
+    return 0
+
+# Penyedia embed yang dikenali, disimpan sebagai kolom kategori 'provider'
+class Provider(str, Enum):
+    SPOTIFY = 'spotify'
+    SOUNDCLOUD = 'soundcloud'
+    YOUTUBE = 'youtube'
+    AUDIO = 'audio'
+    IFRAME = 'iframe'
+
+PROVIDER_LABELS = {
+    Provider.SPOTIFY.value: 'Spotify',
+    Provider.SOUNDCLOUD.value: 'SoundCloud',
+    Provider.YOUTUBE.value: 'YouTube',
+    Provider.AUDIO.value: 'Audio (MP3)',
+    Provider.IFRAME.value: 'Embed lain',
+}
+AUDIO_EXTENSIONS = ('mp3', 'm4a', 'aac', 'ogg', 'oga', 'opus', 'wav', 'flac')
+
+SOUNDCLOUD_EMBED_BASE = "https://w.soundcloud.com/player/?url=https%3A//api.soundcloud.com/tracks/"
+
+# Normalisasi kolom embed_url sekali saat dimuat (vektor, tanpa loop per baris):
+# 'provider', 'embed_base' (URL embed kanonik tanpa parameter waktu) dan 'track_id'
+def normalize_embed_urls(df):
+    if 'embed_url' not in df.columns:
+        return
+    # .str gives NaN for anything that is not a string
+    url = df['embed_url'].astype(object).str.strip()
+    has_url = url.notna() & (url != '')
+
+    is_spotify = url.str.contains('spotify.com', regex=False, na=False)
+    is_soundcloud = url.str.contains('soundcloud.com', regex=False, na=False)
+    is_youtube = url.str.contains(r'youtube\.com|youtu\.be', na=False)
+    # Ids and file extensions are read from the path, without the query string or fragment
+    path = url.str.split(r'[?#]', n=1, regex=True).str[0].str.rstrip('/')
+    is_audio = path.str.lower().str.endswith(tuple('.' + extension for extension in AUDIO_EXTENSIONS), na=False)
+
+    spotify = url.str.extract(r'spotify\.com/(?:embed/)?(episode|track|show|album|playlist)/([A-Za-z0-9]+)')
+    # If it's a direct SoundCloud URL, the track id is its last path segment
+    soundcloud_id = url.str.extract(r'api\.soundcloud\.com/tracks/(\w+)')[0].fillna(
+        path.str.rsplit('/', n=1).str[-1]
+    )
+    youtube_id = url.str.extract(r'(?:embed/|v=|youtu\.be/)([\w-]{11})')[0]
+
+    # Anything else that is not an audio file is only shown as a plain iframe
+    conditions = [is_spotify, is_soundcloud, is_youtube, is_audio]
+    provider = np.select(
+        conditions,
+        [Provider.SPOTIFY.value, Provider.SOUNDCLOUD.value, Provider.YOUTUBE.value, Provider.AUDIO.value],
+        default=Provider.IFRAME.value
+    )
+    embed_base = np.select(
+        conditions,
+        [
+            ("https://open.spotify.com/embed/" + spotify[0] + "/" + spotify[1]).fillna(url),
+            SOUNDCLOUD_EMBED_BASE + soundcloud_id,
+            ("https://www.youtube.com/embed/" + youtube_id).fillna(url),
+            url,
+        ],
+        default=url
+    )
+    # Spotify is addressed by its URI (spotify:episode:<id>) in the embed iFrame API
+    track_id = np.select(conditions, ["spotify:" + spotify[0] + ":" + spotify[1], soundcloud_id, youtube_id, None],
+                         default=None)
+
+    df['provider'] = pd.Categorical(
+        np.where(has_url, provider, None),
+        categories=[p.value for p in Provider]
+    )
+    df['embed_base'] = np.where(has_url, embed_base, None)
+    df['track_id'] = np.where(has_url, track_id, None)
+
+# Function to convert seconds to HH:MM:SS
+def seconds_to_time(total_seconds):
+    total_seconds = int(total_seconds)
+    return f"{total_seconds // 3600:02d}:{total_seconds % 3600 // 60:02d}:{total_seconds % 60:02d}"
+
+def tokenize(text):
+    return re.findall(r'\w+', str(text).lower())
+
+# Tabel bab per audiobook: tuple (detik, judul, label) yang sudah diurai sekali saat dimuat
+def build_chapter_tables(audiobooks_df):
+    chapters = {}
+    if 'timestamp' not in audiobooks_df.columns:
+        return chapters
+    for audiobook_id, timestamp in zip(audiobooks_df['id'], audiobooks_df['timestamp']):
+        if isinstance(timestamp, str):
+            chapters[audiobook_id] = tuple(
+                (time_to_seconds(time_str), title, f"{title} ({time_str})")
+                for time_str, title in parse_timestamps(timestamp)
+            )
+    return chapters
+
+# Reload menyisakan entri/byte mati (versi lama baris yang berubah). Begitu porsinya
+# melewati batas ini, indeks bab dan blob teks dipadatkan ulang.
+COMPACT_FRACTION = 0.25
+
+_NO_ENTRIES = np.zeros(0, dtype=np.int32)
+
+# Indeks pencarian judul bab di seluruh audiobook, dibangun sekali saat katalog dimuat
+class ChapterIndex:
+    def __init__(self, chapters):
+        # entries[n] = (audiobook_id, seconds, title), append-only. An updated index appends
+        # to the same list past this index's `size`, so it is never copied on reload;
+        # entries of removed audiobooks are "dead": no longer in postings or by_audiobook.
+        self.entries = []
+        self.size = 0
+        self.dead = 0
+        self.by_audiobook = {}
+        postings = defaultdict(list)
+        for audiobook_id, table in chapters.items():
+            self.by_audiobook[audiobook_id] = self._add_entries(audiobook_id, table, postings)
+        # Posting lists are sorted int32 arrays of entry numbers
+        self.postings = {token: np.array(entries, dtype=np.int32) for token, entries in postings.items()}
+        self.vocabulary = sorted(self.postings)
+
+    def _add_entries(self, audiobook_id, table, postings):
+        added = []
+        for seconds, title, _ in table:
+            entry = self.size
+            self.entries.append((audiobook_id, seconds, title))
+            self.size += 1
+            added.append(entry)
+            for token in set(tokenize(title)):
+                postings[token].append(entry)
+        return added
+
+    # Function to build a new index with some audiobooks removed and others (re)added.
+    # Unchanged posting lists are shared with this index, which is left untouched
+    # because reruns may still be searching it.
+    def updated(self, removed_ids, chapters):
+        index = ChapterIndex.__new__(ChapterIndex)
+        # Share the entry list while this index is its newest user; otherwise (an older
+        # version updated again) take a copy of this index's own entries
+        index.entries = self.entries if len(self.entries) == self.size else self.entries[:self.size]
+        index.size = self.size
+        index.dead = self.dead
+        index.by_audiobook = dict(self.by_audiobook)
+
+        removed = defaultdict(list)
+        for audiobook_id in set(removed_ids) | set(chapters):
+            dropped = index.by_audiobook.pop(audiobook_id, [])
+            index.dead += len(dropped)
+            for entry in dropped:
+                for token in set(tokenize(index.entries[entry][2])):
+                    removed[token].append(entry)
+        added = defaultdict(list)
+        for audiobook_id, table in chapters.items():
+            index.by_audiobook[audiobook_id] = index._add_entries(audiobook_id, table, added)
+
+        index.postings = dict(self.postings)
+        index.vocabulary = list(self.vocabulary)
+        for token in set(removed) | set(added):
+            entries = self.postings.get(token, _NO_ENTRIES)
+            if token in removed:
+                # Every removed entry is in the sorted posting list of its tokens
+                entries = np.delete(entries, np.searchsorted(entries, removed[token]))
+            if token in added:
+                # New entries are numbered past every existing one, so the list stays sorted
+                entries = np.concatenate([entries, np.array(added[token], dtype=np.int32)])
+            if len(entries):
+                if token not in index.postings:
+                    insort(index.vocabulary, token)
+                index.postings[token] = entries
+            elif token in index.postings:
+                del index.postings[token]
+                index.vocabulary.remove(token)
+
+        if index.dead > index.size * COMPACT_FRACTION:
+            return index.compacted()
+        return index
+
+    # Function to rebuild the index from its live entries only, in the same order
+    def compacted(self):
+        return ChapterIndex({
+            audiobook_id: [(*self.entries[entry][1:], None) for entry in entries]
+            for audiobook_id, entries in self.by_audiobook.items()
+        })
+
+    # Entries whose tokens start with the given prefix, sorted
+    def _prefix_entries(self, prefix):
+        found = []
+        i = bisect_left(self.vocabulary, prefix)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+            found.append(self.postings[self.vocabulary[i]])
+            i += 1
+        return np.unique(np.concatenate(found)) if found else _NO_ENTRIES
+
+    def _entry(self, entry):
+        return self.entries[entry]
+
+    def search(self, query, limit=20):
+        return _search_chapters(self, query, limit)
+
+# Function to find chapters matching every word of the query; returns (audiobook_id, seconds, title)
+def _search_chapters(index, query, limit):
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    matches = None
+    for token in tokens:
+        found = index._prefix_entries(token)
+        matches = found if matches is None else np.intersect1d(matches, found, assume_unique=True)
+        if not len(matches):
+            return []
+    return [index._entry(entry) for entry in matches[:limit].tolist()]
+
+# Indeks yang dipublikasikan catalog_store disimpan sebagai array datar (Arrow/NumPy) yang
+# di-memory-map oleh setiap worker, bukan dict/list Python hasil unpickle: page cache
+# menyimpan satu salinan untuk semua worker. Kelas-kelas di bawah hanya-baca; katalog
+# yang di-attach tidak pernah di-update, catalog_store menerbitkan versi baru.
+
+# Kunci terurut (id atau token) sebagai array Arrow, dicari dengan pencarian biner. Id
+# bertipe campuran (angka dan teks) disimpan sebagai teks, seperti kolom frame di catalog_store.
+class SortedKeys:
+    def __init__(self, keys, as_text=False):
+        self.keys = keys
+        self.as_text = as_text
+
+    # Function to sort keys for storage: (Arrow array of the sorted keys, their original positions, as_text)
+    @staticmethod
+    def build(keys):
+        keys = list(keys)
+        as_text = False
+        try:
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+        except TypeError:
+            keys = [str(key) for key in keys]
+            as_text = True
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+        return pa.array([keys[i] for i in order]), np.array(order, dtype=np.int64), as_text
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, i):
+        return self.keys[i].as_py()
+
+    # Function to get the position of a key, or -1
+    def find(self, key):
+        if self.as_text:
+            key = str(key)
+        try:
+            i = bisect_left(self, key)
+            return i if i < len(self.keys) and self[i] == key else -1
+        except TypeError:
+            # A key of another type (e.g. a text id against numeric ids) is never present
+            return -1
+
+    @property
+    def nbytes(self):
+        return self.keys.get_total_buffer_size()
+
+# id -> posisi baris, seperti dict film_rows/audiobook_rows
+class StoredRows:
+    def __init__(self, keys, positions):
+        self.keys = keys
+        self.positions = positions
+
+    def get(self, key, default=None):
+        i = self.keys.find(key)
+        return default if i < 0 else int(self.positions[i])
+
+    def __contains__(self, key):
+        return self.keys.find(key) >= 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.positions.nbytes
+
+# Tabel bab per audiobook, seperti dict chapters: bab milik kunci ke-i ada di
+# offsets[i]:offsets[i + 1] dari seconds, titles dan labels
+class StoredChapters:
+    def __init__(self, keys, offsets, seconds, titles, labels):
+        self.keys = keys
+        self.offsets = offsets
+        self.seconds = seconds
+        self.titles = titles
+        self.labels = labels
+
+    def get(self, key, default=None):
+        i = self.keys.find(key)
+        if i < 0:
+            return default
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return tuple(zip(self.seconds[start:end].tolist(), self.titles.slice(start, end - start).to_pylist(),
+                         self.labels.slice(start, end - start).to_pylist()))
+
+    def __contains__(self, key):
+        return self.keys.find(key) >= 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self):
+        return (self.keys.nbytes + self.offsets.nbytes + self.seconds.nbytes
+                + self.titles.get_total_buffer_size() + self.labels.get_total_buffer_size())
+
+# ChapterIndex yang sudah dipadatkan: entri ke-n = (entry_ids[n], entry_seconds[n],
+# entry_titles[n]); posting token ke-i (urut vocabulary) ada di postings[offsets[i]:offsets[i + 1]]
+class StoredChapterIndex:
+    def __init__(self, entry_ids, entry_seconds, entry_titles, vocabulary, offsets, postings):
+        self.entry_ids = entry_ids
+        self.entry_seconds = entry_seconds
+        self.entry_titles = entry_titles
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings = postings
+
+    def _prefix_entries(self, prefix):
+        found = []
+        i = bisect_left(self.vocabulary, prefix)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+            found.append(self.postings[self.offsets[i]:self.offsets[i + 1]])
+            i += 1
+        return np.unique(np.concatenate(found)) if found else _NO_ENTRIES
+
+    def _entry(self, entry):
+        return self.entry_ids[entry].as_py(), int(self.entry_seconds[entry]), self.entry_titles[entry].as_py()
+
+    def search(self, query, limit=20):
+        return _search_chapters(self, query, limit)
+
+    @property
+    def nbytes(self):
+        return (self.entry_ids.get_total_buffer_size() + self.entry_seconds.nbytes
+                + self.entry_titles.get_total_buffer_size() + self.vocabulary.nbytes
+                + self.offsets.nbytes + self.postings.nbytes)
+
+# Kolom yang dipakai pencarian dan filter di tiap halaman
+FILM_SEARCH_COLUMNS = ['title', 'director', 'actors', 'genres', 'country', 'writer']
+FILM_FACET_COLUMNS = ['country', 'genres', 'actors', 'director', 'writer']
+AUDIOBOOK_SEARCH_COLUMNS = ['title', 'author', 'narrator', 'genres', 'language']
+AUDIOBOOK_FACET_COLUMNS = ['language', 'genres', 'author', 'narrator']
+NUMERIC_COLUMNS = ['year', 'imdb_rating', 'goodreads_rating', 'duration_seconds', 'chapter_count', 'chapter_avg_seconds']
+
+# Kolom teks panjang yang hanya tampil di expander atau pemutar. Kolom ini tidak ikut
+# di frame katalog; isinya disimpan terkompresi di TextStore dan diambil per id.
+LONG_TEXT_COLUMNS = {
+    'film': ['plot_id'],
+    'audiobook': ['description', 'timestamp'],
+}
+
+# Convert year to integer with proper NaN handling (0 = tidak diketahui)
+def normalize_year(df):
+    if 'year' in df.columns:
+        df['year'] = pd.to_numeric(df['year'], errors='coerce').fillna(0).astype(int)
+
+# Durasi audiobook dalam detik (NaN = tidak diketahui), diurai sekali saat dimuat dengan
+# operasi string per kolom. Excel memberi datetime.time/timedelta ("05:22:55",
+# "1 day, 2:03:04"); teks bisa "5:22", "5j 22m", "5 jam 22 menit" atau "1h 30min".
+# Angka murni di bawah 1 adalah pecahan hari (sel waktu Excel), selain itu menit.
+_DURATION_CLOCK = r'^(?:(?P<days>\d+)\s*days?,?\s*)?(?P<hours>\d+):(?P<minutes>\d{1,2})(?::(?P<seconds>\d{1,2}(?:\.\d+)?))?$'
+_DURATION_UNITS = [
+    (r'(\d+(?:[.,]\d+)?)\s*(?:jam|j|hours?|hrs?|h)(?![a-z])', 3600),
+    (r'(\d+(?:[.,]\d+)?)\s*(?:menit|mnt|minutes?|mins?|m)(?![a-z])', 60),
+    (r'(\d+(?:[.,]\d+)?)\s*(?:detik|dtk|seconds?|secs?|s)(?![a-z])', 1),
+]
+
+def parse_durations(values):
+    text = pd.Series(values, dtype=object).astype(str).str.strip().str.lower()
+    clock = text.str.extract(_DURATION_CLOCK).astype(float)
+    seconds = (clock['days'].fillna(0) * 86400 + clock['hours'] * 3600
+               + clock['minutes'] * 60 + clock['seconds'].fillna(0))
+
+    unit_seconds = pd.Series(0.0, index=text.index)
+    found = pd.Series(False, index=text.index)
+    for pattern, scale in _DURATION_UNITS:
+        amount = text.str.extract(pattern)[0].str.replace(',', '.', regex=False).astype(float)
+        unit_seconds += amount.fillna(0) * scale
+        found |= amount.notna()
+    seconds = seconds.fillna(unit_seconds.where(found))
+
+    number = pd.to_numeric(text, errors='coerce')
+    seconds = seconds.fillna(pd.Series(np.where(number < 1, number * 86400, number * 60), index=text.index))
+    return seconds.where(seconds >= 0).to_numpy(dtype=float)
+
+def normalize_duration(df):
+    if 'duration' in df.columns:
+        df['duration_seconds'] = parse_durations(df['duration'])
+
+# Jumlah bab dan rata-rata panjang bab (detik) dari tabel bab yang sudah diurai. Bab
+# terakhir berakhir di akhir durasi; tanpa durasi, rata-rata dihitung dari awal bab
+# pertama sampai awal bab terakhir.
+def add_chapter_stats(df, chapters):
+    if 'id' not in df.columns:
+        return
+    tables = [chapters.get(audiobook_id, ()) for audiobook_id in df['id']]
+    counts = np.array([len(table) for table in tables], dtype=float)
+    last_start = np.array([table[-1][0] if table else np.nan for table in tables], dtype=float)
+    durations = (df['duration_seconds'].to_numpy(dtype=float) if 'duration_seconds' in df.columns
+                 else np.full(len(df), np.nan))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average = np.where(~np.isnan(durations) & (counts > 0), durations / counts,
+                           np.where(counts > 1, last_start / (counts - 1), np.nan))
+    df['chapter_count'] = counts.astype(int)
+    df['chapter_avg_seconds'] = average
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+# Kolom siap-filter, dibangun sekali per katalog: teks pencarian (huruf kecil),
+# nilai facet dan token facet hasil split sebagai array Arrow (bisa di-memory-map
+# apa adanya oleh catalog_store), nilai numerik sebagai array NumPy read-only
+def build_columns(df, search_columns, facet_columns):
+    columns = {}
+    present = [col for col in search_columns if col in df.columns]
+    if present:
+        search_text = df[present].astype(object).where(df[present].notna(), '').astype(str)
+        columns['search'] = pa.array(search_text.agg('\n'.join, axis=1).str.lower(), type=pa.string())
+    for col in facet_columns:
+        if col not in df.columns:
+            continue
+        values = df[col].astype(object).where(df[col].notna(), None).map(lambda v: None if v is None else str(v))
+        columns[col] = pa.array(values, type=pa.string())
+        tokens = values.map(lambda v: [t.strip() for t in v.split(',') if t.strip()] if v else [])
+        columns[f'{col}_tokens'] = pa.array(tokens, type=pa.list_(pa.string()))
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            columns[col] = _read_only(pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float))
+    if 'provider' in df.columns:
+        columns['provider'] = pa.array(df['provider'].astype(object), type=pa.string())
+    return columns
+
+# Blob teks terkompresi dengan indeks offset: data berisi nilai-nilai zlib berurutan,
+# spans[kolom][baris] = (awal, akhir) di data, atau (-1, -1) bila kosong. data bisa
+# berupa bytes atau array uint8 yang di-memory-map oleh catalog_store.
+class TextStore:
+    def __init__(self, data, spans, size=None):
+        self.data = data
+        self.spans = spans
+        # Bytes of data used by this store; an updated store may append past it (see updated)
+        self.size = len(data) if size is None else size
+
+    @classmethod
+    def build(cls, df, columns):
+        data = bytearray()
+        spans = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            col_spans = np.full((len(df), 2), -1, dtype=np.int64)
+            for pos, value in enumerate(df[col]):
+                if value is None or (not isinstance(value, str) and pd.isna(value)):
+                    continue
+                blob = zlib.compress(str(value).encode('utf-8'))
+                col_spans[pos] = (len(data), len(data) + len(blob))
+                data += blob
+            spans[col] = col_spans
+        return cls(data, spans)
+
+    def get(self, pos, column):
+        if column not in self.spans:
+            return None
+        start, end = self.spans[column][pos]
+        if start < 0:
+            return None
+        return zlib.decompress(bytes(self.data[start:end])).decode('utf-8')
+
+    # Function to get this store's bytes (without anything a later version appended)
+    def payload(self):
+        return self.data if len(self.data) == self.size else self.data[:self.size]
+
+    # Function to build the store for a reloaded sheet: rows come from this store or from
+    # `changed` (appended after the existing data) in the order given by `source`
+    def updated(self, changed, source):
+        offset = self.size
+        spans = {}
+        for col, col_spans in self.spans.items():
+            changed_spans = changed.spans[col].copy()
+            changed_spans[changed_spans[:, 0] >= 0] += offset
+            spans[col] = np.concatenate([col_spans, changed_spans])[source]
+
+        total = self.size + changed.size
+        live = sum(int((col_spans[:, 1] - col_spans[:, 0])[col_spans[:, 0] >= 0].sum()) for col_spans in spans.values())
+        if total - live > total * COMPACT_FRACTION:
+            return self._compacted(changed, spans)
+        # Append in place while this store is the newest user of the buffer: reruns still
+        # reading this version only look below self.size. A memory-mapped or older
+        # buffer is copied once.
+        if isinstance(self.data, bytearray) and len(self.data) == self.size:
+            data = self.data
+        else:
+            data = bytearray(self.payload())
+        data += changed.payload()
+        return TextStore(data, spans)
+
+    # Function to copy only the values still referenced by `spans` into a fresh blob
+    def _compacted(self, changed, spans):
+        data = bytearray()
+        compact_spans = {}
+        for col, col_spans in spans.items():
+            new_spans = np.full_like(col_spans, -1)
+            for pos in np.flatnonzero(col_spans[:, 0] >= 0):
+                start, end = col_spans[pos]
+                if start < self.size:
+                    value = self.data[start:end]
+                else:
+                    value = changed.data[start - self.size:end - self.size]
+                new_spans[pos] = (len(data), len(data) + end - start)
+                data += value
+            compact_spans[col] = new_spans
+        return TextStore(data, compact_spans)
+
+# Hash konten per baris sheet mentah (sebelum normalisasi), dipakai untuk diff saat reload
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+# Siapkan frame sheet mentah: id dan normalisasi kolom (in place)
+def prepare_frame(df):
+    # Add index as id if not present
+    if not df.empty and 'id' not in df.columns:
+        df['id'] = df.index
+    normalize_embed_urls(df)
+    normalize_year(df)
+    normalize_duration(df)
+
+def drop_long_text(df, media):
+    return df.drop(columns=[col for col in LONG_TEXT_COLUMNS[media] if col in df.columns])
+
+# Ringkasan untuk dashboard Home, dihitung sekali per versi katalog dari kolom filter
+# (tanpa menyalin atau mengurutkan frame): jumlah, daftar rating tertinggi dan
+# distribusi per genre, tahun, negara dan bahasa
+TOP_RATED_LIMIT = 5
+DISTRIBUTION_LIMIT = 15
+
+def _token_counts(columns, name, limit=DISTRIBUTION_LIMIT):
+    tokens = columns.get(f'{name}_tokens')
+    if tokens is None or len(tokens) == 0:
+        return pd.Series(dtype='int64')
+    counts = pc.value_counts(pc.list_flatten(tokens))
+    series = pd.Series(counts.field('counts').to_numpy(), index=counts.field('values').to_pylist())
+    return series.sort_values(ascending=False, kind='stable').head(limit)
+
+def _year_counts(columns):
+    if 'year' not in columns:
+        return pd.Series(dtype='int64')
+    years = columns['year']
+    years, counts = np.unique(years[years > 0].astype(int), return_counts=True)
+    return pd.Series(counts, index=years)
+
+def _top_rated(frame, columns, rating, fields):
+    if rating not in columns or frame.empty:
+        return pd.DataFrame(columns=fields)
+    # NaN rating sorts last
+    order = np.argsort(-np.nan_to_num(columns[rating], nan=-np.inf), kind='stable')[:TOP_RATED_LIMIT]
+    return frame.iloc[order][[col for col in fields if col in frame.columns]].reset_index(drop=True)
+
+def _playable_count(columns):
+    if 'provider' not in columns:
+        return 0
+    return len(columns['provider']) - columns['provider'].null_count
+
+def build_aggregates(catalog):
+    films, audiobooks = catalog.films, catalog.audiobooks
+    film_columns, audiobook_columns = catalog.film_columns, catalog.audiobook_columns
+    return {
+        'film_count': len(films),
+        'audiobook_count': len(audiobooks),
+        'film_playable': _playable_count(film_columns),
+        'audiobook_playable': _playable_count(audiobook_columns),
+        'top_films': _top_rated(films, film_columns, 'imdb_rating', ['id', 'title', 'year', 'imdb_rating', 'poster']),
+        'top_audiobooks': _top_rated(audiobooks, audiobook_columns, 'goodreads_rating',
+                                     ['id', 'title', 'author', 'goodreads_rating', 'cover']),
+        'film_genres': _token_counts(film_columns, 'genres'),
+        'film_years': _year_counts(film_columns),
+        'film_countries': _token_counts(film_columns, 'country'),
+        'audiobook_genres': _token_counts(audiobook_columns, 'genres'),
+        'audiobook_years': _year_counts(audiobook_columns),
+        'audiobook_languages': _token_counts(audiobook_columns, 'language'),
+    }
+
+# Indeks pencarian gabungan film + audiobook untuk Home, dibangun sekali per versi katalog.
+# Satu baris per item: media (0 film, 1 audiobook), posisi baris di frame-nya, judul
+# huruf kecil, teks pencarian, dan rating yang dinormalisasi ke 0..1 untuk peringkat.
+SEARCH_MEDIA = ['film', 'audiobook']
+RATING_SCALES = {'film': ('imdb_rating', 10), 'audiobook': ('goodreads_rating', 5)}
+
+def build_search_index(catalog):
+    media, rows, titles, texts, ratings = [], [], [], [], []
+    for code, name in enumerate(SEARCH_MEDIA):
+        frame = catalog.films if name == 'film' else catalog.audiobooks
+        columns = catalog.film_columns if name == 'film' else catalog.audiobook_columns
+        if frame.empty or 'search' not in columns:
+            continue
+        media.append(np.full(len(frame), code, dtype=np.int8))
+        rows.append(np.arange(len(frame), dtype=np.int32))
+        title = frame['title'] if 'title' in frame.columns else pd.Series('', index=frame.index)
+        titles.append(pa.array(title.astype(object).where(title.notna(), '').astype(str).str.lower(), type=pa.string()))
+        texts.append(columns['search'])
+        rating, scale = RATING_SCALES[name]
+        values = columns[rating] if rating in columns else np.full(len(frame), np.nan)
+        ratings.append(np.nan_to_num(np.asarray(values, dtype=np.float32) / scale, nan=0))
+    if not media:
+        return {'media': np.zeros(0, dtype=np.int8), 'rows': np.zeros(0, dtype=np.int32),
+                'title': pa.array([], type=pa.string()), 'search': pa.array([], type=pa.string()),
+                'rating': np.zeros(0, dtype=np.float32)}
+    return {
+        'media': np.concatenate(media),
+        'rows': np.concatenate(rows),
+        'title': pa.concat_arrays(titles),
+        'search': pa.concat_arrays([text.combine_chunks() if isinstance(text, pa.ChunkedArray) else text
+                                    for text in texts]),
+        'rating': np.concatenate(ratings),
+    }
+
+# Katalog hasil kompilasi workbook: data, indeks id -> baris, tabel bab dan kolom filter
+class Catalog:
+    def __init__(self, films_df, audiobooks_df, source_version, version):
+        self.film_source_columns = list(films_df.columns)
+        self.audiobook_source_columns = list(audiobooks_df.columns)
+        self.film_hashes = row_hashes(films_df)
+        self.audiobook_hashes = row_hashes(audiobooks_df)
+
+        prepare_frame(films_df)
+        prepare_frame(audiobooks_df)
+
+        self.source_version = source_version
+        self.version = version
+        self.film_rows = {film_id: pos for pos, film_id in enumerate(films_df.get('id', []))}
+        self.audiobook_rows = {audiobook_id: pos for pos, audiobook_id in enumerate(audiobooks_df.get('id', []))}
+        self.chapters = build_chapter_tables(audiobooks_df)
+        add_chapter_stats(audiobooks_df, self.chapters)
+        self.chapter_index = ChapterIndex(self.chapters)
+        self.film_texts = TextStore.build(films_df, LONG_TEXT_COLUMNS['film'])
+        self.audiobook_texts = TextStore.build(audiobooks_df, LONG_TEXT_COLUMNS['audiobook'])
+        self.films = drop_long_text(films_df, 'film')
+        self.audiobooks = drop_long_text(audiobooks_df, 'audiobook')
+        self.film_columns = build_columns(films_df, FILM_SEARCH_COLUMNS, FILM_FACET_COLUMNS)
+        self.audiobook_columns = build_columns(audiobooks_df, AUDIOBOOK_SEARCH_COLUMNS, AUDIOBOOK_FACET_COLUMNS)
+        self.film_neighbors, self.film_neighbor_scores = build_neighbors(self.film_columns, FILM_SIMILARITY_COLUMNS)
+        self.audiobook_neighbors, self.audiobook_neighbor_scores = build_neighbors(
+            self.audiobook_columns, AUDIOBOOK_SIMILARITY_COLUMNS)
+
+    # Katalog yang sudah dikompilasi di proses lain (lihat catalog_store.attach)
+    @classmethod
+    def from_parts(cls, **parts):
+        catalog = cls.__new__(cls)
+        catalog.__dict__.update(parts)
+        return catalog
+
+    # Dihitung saat pertama dipakai lalu disimpan di katalog ini (dan dipublikasikan oleh catalog_store)
+    @cached_property
+    def aggregates(self):
+        return build_aggregates(self)
+
+    @cached_property
+    def search_index(self):
+        return build_search_index(self)
+
+    # Durasi audiobook terurut untuk filter rentang "Durasi": (posisi baris, detik), tanpa yang tidak diketahui
+    @cached_property
+    def duration_index(self):
+        return sorted_index(self.audiobook_columns.get('duration_seconds'))
+
+    def get_film(self, film_id):
+        pos = self.film_rows.get(film_id)
+        return None if pos is None else self.films.iloc[pos]
+
+    def get_audiobook(self, audiobook_id):
+        pos = self.audiobook_rows.get(audiobook_id)
+        return None if pos is None else self.audiobooks.iloc[pos]
+
+    # Function to fetch a long text column (see LONG_TEXT_COLUMNS) for one film/audiobook
+    def get_text(self, media, row_id, column):
+        rows = self.film_rows if media == 'film' else self.audiobook_rows
+        texts = self.film_texts if media == 'film' else self.audiobook_texts
+        pos = rows.get(row_id)
+        return None if pos is None else texts.get(pos, column)
+
+    # Function to map an id from a URL (always a string) back to the catalog id, or None
+    def resolve_id(self, media, raw_id):
+        rows = self.film_rows if media == 'film' else self.audiobook_rows
+        if raw_id in rows:
+            return raw_id
+        try:
+            number = int(raw_id)
+        except (TypeError, ValueError):
+            return None
+        return number if number in rows else None
+
+    # Function to get the precomputed "Mirip dengan ini" rows for one film/audiobook, most similar first
+    def similar(self, media, row_id, limit=None):
+        rows = self.film_rows if media == 'film' else self.audiobook_rows
+        frame = self.films if media == 'film' else self.audiobooks
+        neighbors = self.film_neighbors if media == 'film' else self.audiobook_neighbors
+        pos = rows.get(row_id)
+        if pos is None:
+            return frame.iloc[:0]
+        positions = neighbors[pos][:limit]
+        return frame.iloc[positions[positions >= 0]]
+
+# Diff satu sheet terhadap versi sebelumnya. Baris dicocokkan lewat 'id', atau lewat
+# posisi bila sheet tidak punya kolom id, lalu dibandingkan hash kontennya. Hanya baris
+# baru/berubah yang dinormalisasi dan diindeks ulang; sisanya diambil dari katalog lama.
+# Mengembalikan None bila sheet harus dibangun ulang penuh (kolom berubah, id ganda).
+def _diff_sheet(current, media, new_df, search_columns, facet_columns):
+    old_df = current.films if media == 'film' else current.audiobooks
+    old_hashes = getattr(current, f'{media}_hashes', None)
+    old_source_columns = getattr(current, f'{media}_source_columns', None)
+    old_columns = getattr(current, f'{media}_columns')
+    hashes = row_hashes(new_df)
+    if old_hashes is None or old_df.empty or new_df.empty or list(new_df.columns) != old_source_columns:
+        return None
+    if 'id' in new_df.columns:
+        old_keys = pd.Index(old_df['id'])
+        new_keys = new_df['id']
+        if not old_keys.is_unique or not new_df['id'].is_unique:
+            return None
+    else:
+        old_keys = pd.RangeIndex(len(old_df))
+        new_keys = pd.RangeIndex(len(new_df))
+    old_pos = old_keys.get_indexer(new_keys)
+    unchanged = old_pos >= 0
+    unchanged[unchanged] = old_hashes[old_pos[unchanged]] == hashes[unchanged]
+
+    kept = np.zeros(len(old_df), dtype=bool)
+    kept[old_pos[unchanged]] = True
+    changed = np.flatnonzero(~unchanged)
+    diff = {
+        'removed_ids': old_df['id'].to_numpy()[~kept],
+        'changed': changed,
+        'changed_df': new_df.iloc[changed].copy(),
+        'hashes': hashes,
+    }
+    if len(changed) == 0 and kept.all() and np.array_equal(old_pos, np.arange(len(old_df))):
+        diff['unchanged'] = True
+        return diff
+
+    prepare_frame(diff['changed_df'])
+    if media == 'audiobook':
+        diff['chapters'] = build_chapter_tables(diff['changed_df'])
+        add_chapter_stats(diff['changed_df'], diff['chapters'])
+    # Posisi sumber tiap baris hasil: baris lama, atau baris baru di belakang frame lama
+    source = old_pos.copy()
+    source[changed] = len(old_df) + np.arange(len(changed))
+    frame = pd.concat([old_df, drop_long_text(diff['changed_df'], media)], ignore_index=True)
+    diff['frame'] = frame.iloc[source].reset_index(drop=True)
+    changed_texts = TextStore.build(diff['changed_df'], LONG_TEXT_COLUMNS[media])
+    diff['texts'] = getattr(current, f'{media}_texts').updated(changed_texts, source)
+    diff['in_place'] = np.array_equal(source[unchanged], np.flatnonzero(unchanged))
+    diff['source'] = source
+
+    if len(changed):
+        changed_columns = build_columns(diff['changed_df'], search_columns, facet_columns)
+    else:
+        # Hanya penghapusan/pindah urutan: tidak ada yang perlu diindeks
+        changed_columns = {name: values[:0] for name, values in old_columns.items()}
+    columns = {}
+    take = pa.array(source, type=pa.int64())
+    for name, values in old_columns.items():
+        if name not in changed_columns:
+            return None
+        if isinstance(values, np.ndarray):
+            columns[name] = _read_only(np.concatenate([values, changed_columns[name]])[source])
+        else:
+            columns[name] = pa.concat_arrays([values, changed_columns[name]]).take(take)
+    diff['columns'] = columns
+    return diff
+
+def _diff_rows(old_rows, diff):
+    # Baris lama tidak bergeser (hanya ubah/tambah di akhir): cukup perbarui entri yang berubah
+    if diff['in_place']:
+        rows = dict(old_rows)
+        for removed_id in diff['removed_ids']:
+            rows.pop(removed_id, None)
+        for pos, row_id in zip(diff['changed'], diff['changed_df']['id']):
+            rows[row_id] = int(pos)
+        return rows
+    return {row_id: pos for pos, row_id in enumerate(diff['frame']['id'])}
+
+# Function to apply a reloaded workbook to the current catalog, reprocessing only the changed rows
+def update_catalog(current, films_df, audiobooks_df, source_version, version):
+    film_diff = _diff_sheet(current, 'film', films_df, FILM_SEARCH_COLUMNS, FILM_FACET_COLUMNS)
+    audiobook_diff = _diff_sheet(current, 'audiobook', audiobooks_df, AUDIOBOOK_SEARCH_COLUMNS, AUDIOBOOK_FACET_COLUMNS)
+    if film_diff is None or audiobook_diff is None:
+        return Catalog(films_df, audiobooks_df, source_version, version)
+
+    parts = dict(current.__dict__)
+    # Derived per-version data is recomputed for the new catalog
+    parts.pop('aggregates', None)
+    parts.pop('search_index', None)
+    parts.pop('duration_index', None)
+    parts['source_version'] = source_version
+    parts['version'] = version
+    for media, diff in (('film', film_diff), ('audiobook', audiobook_diff)):
+        parts[f'{media}_hashes'] = diff['hashes']
+        if diff.get('unchanged'):
+            continue
+        frame_attribute = 'films' if media == 'film' else 'audiobooks'
+        parts[frame_attribute] = diff['frame']
+        parts[f'{media}_columns'] = diff['columns']
+        parts[f'{media}_texts'] = diff['texts']
+        parts[f'{media}_rows'] = _diff_rows(getattr(current, f'{media}_rows'), diff)
+        # Neighbor lists are carried over through the new row positions; only the rows
+        # touched by the change are scored again
+        similarity_columns = FILM_SIMILARITY_COLUMNS if media == 'film' else AUDIOBOOK_SIMILARITY_COLUMNS
+        parts[f'{media}_neighbors'], parts[f'{media}_neighbor_scores'] = update_neighbors(
+            diff['columns'], similarity_columns, getattr(current, f'{media}_neighbors'),
+            getattr(current, f'{media}_neighbor_scores'), diff['source'], diff['changed'])
+
+    if not audiobook_diff.get('unchanged'):
+        changed_chapters = audiobook_diff['chapters']
+        chapters = dict(current.chapters)
+        # Baris yang berubah juga ada di removed_ids: versi lamanya tidak dipakai lagi
+        for audiobook_id in audiobook_diff['removed_ids']:
+            chapters.pop(audiobook_id, None)
+        chapters.update(changed_chapters)
+        parts['chapters'] = chapters
+        parts['chapter_index'] = current.chapter_index.updated(audiobook_diff['removed_ids'], changed_chapters)
+    return Catalog.from_parts(**parts)
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_watcher = None
+
+# Seberapa sering (detik) watcher memeriksa file Excel atau versi catalog_store
+WATCH_INTERVAL = float(os.environ.get("SELIRA_WATCH_INTERVAL", 2))
+
+# Function to load the newest catalog; returns `current` when nothing changed or the load failed
+def _load_catalog(current):
+    import catalog_store
+    store_dir = catalog_store.get_store_dir()
+    if store_dir is not None:
+        attached = catalog_store.attach(store_dir)
+        if attached is not None:
+            return attached
+
+    source_version = get_data_version()
+    if current is not None and current.source_version == source_version:
+        return current
+    return _traced_build(current, source_version)
+
+# Function to build the catalog from the workbooks: the first version from scratch, later
+# versions as a diff against `current`. Returns `current` when the workbooks could not be
+# read. Used by the in-process watcher and by the catalog_store loader.
+def build_catalog(current, source_version):
+    films_df, audiobooks_df = load_excel_data()
+    # Jangan ganti katalog dengan hasil gagal baca (mis. file sedang disimpan)
+    if films_df.empty and audiobooks_df.empty:
+        return current
+    if current is None:
+        return Catalog(films_df, audiobooks_df, source_version, 1)
+    return update_catalog(current, films_df, audiobooks_df, source_version, current.version + 1)
+
+# Alokasi puncak selama reload bisa diukur dengan tracemalloc. Tidak aktif secara default:
+# tracemalloc memperlambat semua alokasi di proses, termasuk rerun yang berjalan bersamaan
+# (dan ikut menghitungnya). SELIRA_TRACE_RELOAD=1 mengukur setiap reload, =snapshot juga
+# mencatat lokasi alokasi teratas; admin juga bisa mengukur satu reload berikutnya dari
+# halaman Memori (arm_reload_trace).
+TRACE_RELOAD = os.environ.get("SELIRA_TRACE_RELOAD", "0").lower()
+
+# Statistik reload terakhir, ditampilkan di halaman Memori
+_reload_stats = None
+# Permintaan dari halaman Memori untuk mengukur reload berikutnya: None, 'peak' atau 'snapshot'
+_trace_request = None
+
+def get_reload_stats():
+    return _reload_stats
+
+def arm_reload_trace(snapshot=False):
+    global _trace_request
+    _trace_request = 'snapshot' if snapshot else 'peak'
+
+def get_reload_trace_request():
+    return _trace_request
+
+def _traced_build(current, source_version):
+    global _reload_stats, _trace_request
+    mode = _trace_request or {'1': 'peak', 'snapshot': 'snapshot'}.get(TRACE_RELOAD)
+    if mode is None:
+        return build_catalog(current, source_version)
+    _trace_request = None
+    # Jangan matikan tracemalloc kalau sudah dinyalakan pihak lain
+    owner = not tracemalloc.is_tracing()
+    if owner:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        catalog = build_catalog(current, source_version)
+        snapshot = tracemalloc.take_snapshot() if owner and mode == 'snapshot' else None
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        if owner:
+            tracemalloc.stop()
+    _reload_stats = {
+        'version': catalog.version if catalog is not None else None,
+        'finished_at': time.time(),
+        'seconds': time.perf_counter() - started,
+        'peak_bytes': peak,
+        'retained_bytes': retained,
+        'top_retained': [
+            (str(stat.traceback[0]), stat.size)
+            for stat in snapshot.statistics('lineno')[:10]
+        ] if snapshot is not None else [],
+    }
+    return catalog
+
+# Function to wait until the workbooks stop changing (same version over a whole interval),
+# so a file that is still being saved is not read; returns the settled data version
+def wait_until_settled(interval):
+    seen = get_data_version()
+    while True:
+        time.sleep(interval)
+        source_version = get_data_version()
+        if source_version == seen:
+            return source_version
+        seen = source_version
+
+# Watcher berjalan di thread latar: katalog baru dibangun lengkap dengan semua indeksnya
+# di luar jalur request, lalu ditukar dengan satu assignment referensi. Rerun yang sedang
+# berjalan tetap memakai objek katalog lama yang sudah dipegangnya.
+def _watch():
+    global _catalog
+    while True:
+        try:
+            wait_until_settled(WATCH_INTERVAL)
+            catalog = _load_catalog(_catalog)
+            if catalog is not None and catalog is not _catalog:
+                _catalog = catalog
+        except Exception:
+            traceback.print_exc()
+
+def start_watcher():
+    global _watcher
+    if _watcher is not None:
+        return
+    with _catalog_lock:
+        if _watcher is None:
+            _watcher = threading.Thread(target=_watch, name="catalog-watcher", daemon=True)
+            _watcher.start()
+
+# Katalog dimuat sekali per proses; setelah itu hanya watcher yang memuat ulang, jadi
+# request tidak pernah menunggu reload. Dengan SELIRA_CATALOG_STORE, worker memakai
+# katalog yang dipublikasikan catalog_store.
+def get_catalog():
+    global _catalog
+    catalog = _catalog
+    if catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = _load_catalog(None)
+            catalog = _catalog
+        if catalog is None:
+            # Gagal baca, coba lagi pada permintaan berikutnya
+            return Catalog(pd.DataFrame(), pd.DataFrame(), 0, 0)
+    start_watcher()
+    return catalog
+
+# DataFrame katalog dipakai bersama oleh semua sesi, perlakukan sebagai read-only
 def get_films():
-    films_df, _ = load_excel_data()    
-    return films_df
+    return get_catalog().films
 
 def get_audiobooks():
-    _, audiobooks_df = load_excel_data()
-    return audiobooks_df
-
+    return get_catalog().audiobooks
@@ -0,0 +1,56 @@
+import streamlit as st
+
+from filters import top_facet_options
+
+# Facet picker for high-cardinality fields (pemeran, sutradara, penulis, ...).
+# Instead of every distinct name, the multiselect only gets the FACET_PICKER_LIMIT
+# most frequent values in the current rows, narrowed server-side by the prefix typed
+# in the search box above it, plus whatever is already selected. The payload sent
+# to the browser stays the same size however large the catalog grows.
+
+FACET_PICKER_LIMIT = 50
+
+# Function to render a searchable facet picker in the sidebar; returns the selected values.
+# With a result_cache.FilterCache the option counts are reused while the rows are unchanged.
+# Inside a form (batched filters) the search box is submitted together with the other filters.
+def facet_picker(label, tokens, rows, key, limit=FACET_PICKER_LIMIT, cache=None, container=None):
+    container = st.sidebar if container is None else container
+    selected_key = f"{key}_selected"
+    widget_key = f"{key}_multiselect"
+    # The options and default below are part of the widget id, so they are built
+    # from the selection the browser just sent (readable under the widget key before
+    # the widget is rendered again), not from the previous rerun's selection
+    if widget_key in st.session_state:
+        st.session_state[selected_key] = list(st.session_state[widget_key])
+    selected = st.session_state.get(selected_key, [])
+    prefix = container.text_input(
+        f"Cari {label.lower()}",
+        key=f"{key}_search",
+        placeholder=f"🔍 Cari {label.lower()}...",
+        label_visibility="collapsed"
+    )
+    if cache is None:
+        values, counts, matching = top_facet_options(tokens, rows, prefix, limit)
+    else:
+        values, counts, matching = cache.derive(
+            f"{key}_options", (prefix, limit), lambda: top_facet_options(tokens, rows, prefix, limit))
+    counts_by_value = dict(zip(values, counts))
+    # Selected values stay available even when they fall outside the top N or the prefix
+    options = selected + [value for value in values if value not in selected]
+
+    if prefix:
+        help_text = f"{min(matching, limit)} dari {matching} nama yang cocok dengan \"{prefix}\""
+    else:
+        help_text = f"{min(matching, limit)} teratas dari {matching} nama; ketik untuk mencari yang lain"
+    # The options change as the user types, which gives the widget a new id; the
+    # default carries the selection over, and selected_key keeps it across pages
+    selected = container.multiselect(
+        label,
+        options=options,
+        default=selected,
+        key=widget_key,
+        format_func=lambda value: f"{value} ({counts_by_value[value]})" if value in counts_by_value else value,
+        help=help_text
+    )
+    st.session_state[selected_key] = selected
+    return selected
@@ -0,0 +1,119 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Filter pipeline over row ids. Every stage takes the int32 row ids that are
+# still in the result and returns the ids that pass; the shared catalog
+# columns are never copied, rows are materialized only for the visible page.
+# Text columns are Arrow arrays, numeric columns NumPy arrays.
+
+def all_rows(df):
+    return np.arange(len(df), dtype=np.int32)
+
+def _mask(result):
+    return result.fill_null(False).to_numpy(zero_copy_only=False)
+
+# Function to keep rows whose search text contains the query
+def search_rows(search_text, rows, query):
+    if not query:
+        return rows
+    return rows[_mask(pc.match_substring(search_text.take(rows), query.lower()))]
+
+# Function to search the merged film + audiobook index (database.build_search_index).
+# Ranked by where the query matches: whole title, title prefix, inside the title, other
+# fields; ties by normalized rating. Returns index positions, best first.
+def ranked_search(index, query, limit):
+    query = query.strip().lower()
+    if not query:
+        return np.zeros(0, dtype=np.int64)
+    hits = np.flatnonzero(_mask(pc.match_substring(index['search'], query)))
+    if not hits.size:
+        return hits
+    titles = index['title'].take(hits)
+    rank = (_mask(pc.equal(titles, query)).astype(np.int8)
+            + _mask(pc.starts_with(titles, query))
+            + _mask(pc.match_substring(titles, query)))
+    order = np.lexsort((-index['rating'][hits], -rank))[:limit]
+    return hits[order]
+
+# Function to list the facet values present in the given rows
+def facet_options(tokens, rows):
+    return sorted(pc.unique(pc.list_flatten(tokens.take(rows))).to_pylist())
+
+# Function to pick the options of a high-cardinality facet: the `limit` most frequent
+# values in the rows (ties alphabetical), optionally only names with a word starting
+# with `prefix`. Returns (values, counts, number of matching values).
+def top_facet_options(tokens, rows, prefix, limit):
+    value_counts = pc.value_counts(pc.list_flatten(tokens.take(rows)))
+    values = value_counts.field('values')
+    counts = value_counts.field('counts').to_numpy(zero_copy_only=False)
+    prefix = prefix.strip().lower()
+    if prefix:
+        lower = pc.utf8_lower(values)
+        keep = _mask(pc.or_(pc.starts_with(lower, prefix), pc.match_substring(lower, " " + prefix)))
+        values, counts = values.filter(pa.array(keep)), counts[keep]
+    names = np.asarray(values.to_pylist(), dtype=object)
+    order = np.lexsort((names, -counts))[:limit]
+    return names[order].tolist(), counts[order].tolist(), len(names)
+
+# Function to list the distinct non-empty values present in the given rows
+def present_values(values, rows):
+    return {value for value in pc.unique(values.take(rows)).to_pylist() if value is not None}
+
+# Function to keep rows whose field contains any of the selected values
+def facet_rows(values, rows, selected):
+    if not selected:
+        return rows
+    subset = values.take(rows)
+    mask = np.zeros(len(rows), dtype=bool)
+    for value in selected:
+        mask |= _mask(pc.match_substring(subset, value))
+    return rows[mask]
+
+# Function to keep rows whose value is one of the selected values
+def isin_rows(values, rows, selected):
+    if not selected:
+        return rows
+    return rows[_mask(pc.is_in(values.take(rows), value_set=pa.array(selected, type=values.type)))]
+
+# Function to get the (min, max) of the known years (0 = unknown) in the rows, or None
+def year_bounds(values, rows):
+    years = values[rows]
+    years = years[years != 0]
+    return (int(years.min()), int(years.max())) if years.size else None
+
+# Function to get the (min, max) of a numeric column in the rows, ignoring NaN
+def value_bounds(values, rows):
+    return float(np.nanmin(values[rows])), float(np.nanmax(values[rows]))
+
+# Function to get the whole-minute (min, max) of a duration column (seconds) in the rows, or None
+def minute_bounds(values, rows):
+    seconds = values[rows]
+    seconds = seconds[~np.isnan(seconds)]
+    if not seconds.size:
+        return None
+    return int(seconds.min() // 60), int(-(-seconds.max() // 60))
+
+# Function to build a sorted index over a numeric column: (row ids, values), ascending, NaN left out
+def sorted_index(values):
+    if values is None:
+        return np.zeros(0, dtype=np.int32), np.zeros(0)
+    known = np.flatnonzero(~np.isnan(values))
+    order = known[np.argsort(values[known], kind='stable')].astype(np.int32)
+    return order, values[order]
+
+# Function to keep rows whose value lies in [low, high], looked up in a sorted_index
+def sorted_range_rows(index, n_rows, rows, low, high):
+    order, values = index
+    start, stop = np.searchsorted(values, low, side='left'), np.searchsorted(values, high, side='right')
+    inside = np.zeros(n_rows, dtype=bool)
+    inside[order[start:stop]] = True
+    return rows[inside[rows]]
+
+# Function to keep rows inside a numeric range, optionally keeping zero (unknown) values
+def range_rows(values, rows, low, high, keep_zero=False):
+    subset = values[rows]
+    mask = (subset >= low) & (subset <= high)
+    if keep_zero:
+        mask |= subset == 0
+    return rows[mask]
@@ -0,0 +1,112 @@
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from database import get_catalog
+from cards import COUNTRY_TO_FLAG, LANGUAGE_TO_FLAG, to_flags, image_url, duration_text
+
+# Number of cards sent to the browser per request
+BATCH_SIZE = 50
+
+FIELDS = ['id', 'title', 'image', 'rating', 'flags', 'details', 'playable']
+
+_component = components.declare_component(
+    "infinite_grid",
+    path=str(Path(__file__).parent / "frontend" / "infinite_grid")
+)
+
+# Function to convert numpy/pandas values into plain JSON values
+def _plain(value):
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def _title_with_year(row):
+    title = row.get('title', 'Judul tidak tersedia')
+    year = row.get('year', 0)
+    return f"{title} ({year if year != 0 else 'Tidak tersedia'})"
+
+def _has_media(row):
+    embed_url = row.get('embed_url', '')
+    return bool(pd.notna(embed_url) and embed_url != '')
+
+def _film_record(film):
+    return [
+        film.get('id'),
+        _title_with_year(film),
+        image_url(film.get('poster', '')),
+        f"⭐ {film.get('imdb_rating', 'N/A')}/10",
+        to_flags(film.get('country', 'Tidak tersedia'), COUNTRY_TO_FLAG),
+        [film.get(col, 'Tidak tersedia') for col in ['genres', 'director', 'actors', 'writer']],
+        _has_media(film),
+    ]
+
+def _audiobook_record(audiobook):
+    return [
+        audiobook.get('id'),
+        _title_with_year(audiobook),
+        image_url(audiobook.get('cover', '')),
+        f"⭐ {audiobook.get('goodreads_rating', 'N/A')}/5",
+        to_flags(audiobook.get('language', 'Tidak tersedia'), LANGUAGE_TO_FLAG),
+        [duration_text(audiobook)] + [str(audiobook.get(col, 'Tidak tersedia')) for col in ['genres', 'author', 'narrator']],
+        _has_media(audiobook),
+    ]
+
+# Media specific settings: record builder, detail labels and play button label
+RECORD_BUILDERS = {
+    'film': (_film_record, ['Genre', 'Sutradara', 'Pemeran', 'Penulis'], "▶️ Tonton"),
+    'audiobook': (_audiobook_record, ['Durasi', 'Genre', 'Penulis', 'Narator'], "▶️ Dengarkan"),
+}
+
+# Function to build one compact batch of card records from the result row ids
+def card_batch(media, df, rows, offset, limit=BATCH_SIZE):
+    build_record, _, _ = RECORD_BUILDERS[media]
+    records = [_plain(build_record(row)) for _, row in df.iloc[rows[offset:offset + limit]].iterrows()]
+    return {'offset': offset, 'rows': records}
+
+# Function to identify a result set, so the browser drops its cards when filters change
+def dataset_token(version, rows):
+    return f"{version}-{len(rows)}-{hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()}"
+
+# Virtualized infinite-scroll grid. It runs as a fragment, so fetching the
+# next batch only reruns this function instead of the whole page.
+@st.fragment
+def infinite_grid(media, df, rows, dataset, on_play, key):
+    _, labels, play_label = RECORD_BUILDERS[media]
+    request = st.session_state.get(key) or {}
+
+    # A "play" click needs the full page to rerun so the player shows up
+    handled_key = f"{key}_handled"
+    if request.get('play') is not None and request.get('seq') != st.session_state.get(handled_key):
+        st.session_state[handled_key] = request.get('seq')
+        catalog = get_catalog()
+        get_row = catalog.get_film if media == 'film' else catalog.get_audiobook
+        row = get_row(request['play'])
+        if row is not None:
+            on_play(row)
+            st.rerun()
+
+    offset = request.get('offset') or 0
+    if offset >= len(rows):
+        offset = 0
+    _component(
+        media=media,
+        dataset=dataset,
+        total=len(rows),
+        batch_size=BATCH_SIZE,
+        fields=FIELDS,
+        labels=labels,
+        play_label=play_label,
+        batch=card_batch(media, df, rows, offset),
+        key=key,
+        default=None
+    )
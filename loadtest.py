@@ -0,0 +1,212 @@
+import argparse
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+import database
+
+# Load test: scripted AppTest sessions against a synthetic catalog.
+#
+#   python loadtest.py --sessions 50 --workers 8 --films 20000 --audiobooks 5000
+#   python loadtest.py --mode process --sessions 50 --workers 8
+#
+# Every session opens Home, Film and Audiobook and, on both media pages, types a
+# search, toggles a facet, pages forward and opens/closes the player. Each
+# AppTest.run() is one rerun; the report gives p50/p95/p99 rerun latency per
+# page, overall throughput and peak RSS.
+
+APP_DIR = Path(__file__).parent
+PAGES = {
+    'home': APP_DIR / "🏠 Home.py",
+    'film': APP_DIR / "pages" / "🎬 Film.py",
+    'audiobook': APP_DIR / "pages" / "🎧 Audiobook.py",
+}
+
+WORDS = ["hujan", "malam", "kota", "rahasia", "laut", "bintang", "jalan", "rumah", "api", "angin",
+         "perang", "cinta", "hutan", "pulang", "bayangan", "waktu", "sungai", "langit", "batu", "janji"]
+NAMES = ["Andi", "Budi", "Citra", "Dewi", "Eka", "Fajar", "Gita", "Hadi", "Intan", "Joko",
+         "Kartika", "Lestari", "Made", "Nadia", "Oka", "Putri", "Rudi", "Sari", "Tono", "Wulan"]
+GENRES = ["Action", "Drama", "Comedy", "Horror", "Romance", "Thriller", "Sci-Fi", "Animation", "Mystery", "Fantasy"]
+COUNTRIES = ["Indonesia", "United States", "Japan", "South Korea", "France", "India", "Thailand", "China"]
+LANGUAGES = ["Indonesian", "English", "Japanese", "Korean"]
+EMBEDS = [
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    "https://open.spotify.com/episode/2F1DnzcmRg2b1K1ExJGRwS",
+    "https://soundcloud.com/selira/track-{}",
+    "https://example.com/audio/{}.mp3",
+]
+
+def _pick(rng, values, low, high):
+    return ", ".join(rng.sample(values, rng.randint(low, high)))
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+# Function to build a synthetic films/audiobooks pair shaped like data_hiburan.xlsx
+def synthetic_frames(films, audiobooks, seed=0):
+    rng = random.Random(seed)
+    film_rows = []
+    for i in range(films):
+        film_rows.append({
+            'title': f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}",
+            'year': rng.choice([0, *range(1970, 2025)]),
+            'genres': _pick(rng, GENRES, 1, 3),
+            'director': rng.choice(NAMES) + " " + rng.choice(NAMES),
+            'writer': _pick(rng, NAMES, 1, 2),
+            'actors': _pick(rng, NAMES, 2, 4),
+            'plot_id': " ".join(_sentence(rng, 12) for _ in range(4)),
+            'country': _pick(rng, COUNTRIES, 1, 2),
+            'poster': f"https://example.com/poster/{i}.jpg",
+            'imdb_rating': round(rng.uniform(1, 10), 1),
+            'embed_url': rng.choice(EMBEDS[:1] + [None]),
+        })
+    audiobook_rows = []
+    for i in range(audiobooks):
+        chapters = " ".join(
+            f"{minute // 60:02d}:{minute % 60:02d}:00 {_sentence(rng, 3)}"
+            for minute in range(0, rng.randint(5, 40) * 10, 10)
+        )
+        audiobook_rows.append({
+            'title': f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}",
+            'narrator': rng.choice(NAMES),
+            'duration': f"{rng.randint(1, 12)}j {rng.randint(0, 59)}m",
+            'language': rng.choice(LANGUAGES),
+            'embed_url': rng.choice(EMBEDS[1:]).format(i),
+            'id': f"ab{i:06d}",
+            'timestamp': chapters,
+            'author': rng.choice(NAMES) + " " + rng.choice(NAMES),
+            'goodreads_rating': round(rng.uniform(1, 5), 2),
+            'genres': _pick(rng, GENRES, 1, 2),
+            'year': rng.choice(range(1950, 2025)),
+            'cover': f"https://example.com/cover/{i}.jpg",
+            'description': " ".join(_sentence(rng, 12) for _ in range(6)),
+        })
+    return pd.DataFrame(film_rows), pd.DataFrame(audiobook_rows)
+
+# Function to make every page in this process use the synthetic catalog
+def install_synthetic_catalog(films, audiobooks, seed=0):
+    films_df, audiobooks_df = synthetic_frames(films, audiobooks, seed)
+    # source_version matches the workbook on disk, so the watcher never replaces it
+    database._catalog = database.Catalog(films_df, audiobooks_df, database.get_data_version(), 1)
+
+# AppTest swaps process-global runtime state for every run, so runs inside one
+# process are serialized. Sequential mode keeps N sessions alive in one process (one
+# shared catalog, like one Streamlit worker) and interleaves their reruns one at a
+# time; only process mode runs sessions in parallel.
+_run_lock = threading.Lock()
+
+def _timed_run(at, latencies, page):
+    with _run_lock:
+        start = time.perf_counter()
+        at.run()
+        latencies.append((page, time.perf_counter() - start))
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+
+def _media_session(at, latencies, page, rng):
+    _timed_run(at, latencies, page)
+    # Type a search, then clear it again
+    at.text_input[0].input(rng.choice(WORDS)[:3])
+    _timed_run(at, latencies, page)
+    at.text_input[0].input("")
+    _timed_run(at, latencies, page)
+    # Toggle a facet on and off; element handles go stale after a run, so query it again
+    facet = at.sidebar.multiselect[1]
+    if facet.options:
+        facet.select(rng.choice(facet.options))
+        _timed_run(at, latencies, page)
+        at.sidebar.multiselect[1].set_value([])
+        _timed_run(at, latencies, page)
+    # Page forward twice
+    for _ in range(2):
+        next_button = at.button(key='next_btn_bottom')
+        if next_button.disabled:
+            break
+        next_button.click()
+        _timed_run(at, latencies, page)
+    # Open and close the player
+    play_buttons = [button for button in at.button if (button.key or '').startswith('play_btn_')]
+    if play_buttons:
+        rng.choice(play_buttons).click()
+        _timed_run(at, latencies, page)
+        close = [button for button in at.button if button.label.startswith("❌")]
+        if close:
+            close[0].click()
+            _timed_run(at, latencies, page)
+
+# Function to run one scripted user session over all pages; returns (page, seconds) per rerun
+def run_session(seed):
+    rng = random.Random(seed)
+    latencies = []
+    home = AppTest.from_file(str(PAGES['home']), default_timeout=120)
+    _timed_run(home, latencies, 'home')
+    _timed_run(home, latencies, 'home')
+    for page in ('film', 'audiobook'):
+        at = AppTest.from_file(str(PAGES[page]), default_timeout=120)
+        _media_session(at, latencies, page, rng)
+    return latencies
+
+def _process_init(films, audiobooks, seed):
+    install_synthetic_catalog(films, audiobooks, seed)
+
+def _process_sessions(seeds):
+    return [latency for seed in seeds for latency in run_session(seed)]
+
+def _peak_rss_mb(who):
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(who).ru_maxrss * scale / 2 ** 20
+
+def report(latencies, wall, args):
+    if args.mode == 'process':
+        workers = f"{args.workers} proses worker paralel"
+    else:
+        workers = f"{args.workers} sesi bergantian dalam 1 proses, rerun berurutan"
+    print(f"{args.sessions} sesi, {workers}, {args.films} film / {args.audiobooks} audiobook sintetis")
+    print(f"{'halaman':<12}{'rerun':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for page in ['home', 'film', 'audiobook', 'semua']:
+        values = np.array([seconds for name, seconds in latencies if page in (name, 'semua')]) * 1000
+        if values.size:
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            print(f"{page:<12}{values.size:>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+    print(f"throughput: {len(latencies) / wall:.1f} rerun/detik ({args.sessions / wall:.2f} sesi/detik)")
+    print(f"peak RSS: {_peak_rss_mb(resource.RUSAGE_SELF):.0f} MB proses utama", end="")
+    if args.mode == 'process':
+        print(f", {_peak_rss_mb(resource.RUSAGE_CHILDREN):.0f} MB worker terbesar")
+    else:
+        print()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Selira pages with scripted AppTest sessions")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=['sequential', 'process'], default='sequential')
+    parser.add_argument("--films", type=int, default=5000)
+    parser.add_argument("--audiobooks", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    seeds = [args.seed + i for i in range(args.sessions)]
+    start = time.perf_counter()
+    if args.mode == 'sequential':
+        install_synthetic_catalog(args.films, args.audiobooks, args.seed)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            latencies = [latency for result in pool.map(run_session, seeds) for latency in result]
+    else:
+        chunks = [seeds[i::args.workers] for i in range(args.workers)]
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_process_init,
+                                 initargs=(args.films, args.audiobooks, args.seed)) as pool:
+            latencies = [latency for result in pool.map(_process_sessions, chunks) for latency in result]
+    report(latencies, time.perf_counter() - start, args)
+
+if __name__ == "__main__":
+    main()
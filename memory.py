@@ -0,0 +1,126 @@
+import resource
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import prefetch
+
+# Perhitungan memori untuk halaman admin Memori: ukuran dalam per kolom katalog
+# dan per struktur indeks, state per sesi, dan RSS proses.
+
+# Function to estimate the deep size of a Python object graph in bytes.
+# Arrays count their buffers; memory-mapped arrays count 0 (page cache, shared by workers).
+def deep_sizeof(obj):
+    total = 0
+    seen = set()
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.memmap):
+            continue
+        if isinstance(item, np.ndarray):
+            total += item.nbytes if item.base is None or not isinstance(item.base, np.memmap) else 0
+            if item.dtype == object:
+                stack.extend(item.ravel())
+            continue
+        if isinstance(item, (pa.Array, pa.ChunkedArray)):
+            total += item.get_total_buffer_size()
+            continue
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            total += int(np.sum(item.memory_usage(deep=True)))
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__') and not isinstance(item, type):
+            stack.append(item.__dict__)
+    return total
+
+# Function to size one index: the flat ones attached from catalog_store report their mapped bytes
+def _index_size(index):
+    if hasattr(index, 'nbytes') and not isinstance(index, np.ndarray):
+        return index.nbytes, "mmap"
+    return deep_sizeof(index), "heap"
+
+def _storage(values):
+    if isinstance(values, np.memmap) or isinstance(getattr(values, 'base', None), np.memmap):
+        return "mmap"
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return "Arrow"
+    return "heap"
+
+# Function to list the memory of every catalog part: frame columns, filter columns, long texts and indexes
+def catalog_memory(catalog):
+    rows = []
+    for media, frame in (('film', catalog.films), ('audiobook', catalog.audiobooks)):
+        usage = frame.memory_usage(deep=True, index=False)
+        for col in frame.columns:
+            storage = "Arrow" if isinstance(frame[col].dtype, pd.ArrowDtype) else "heap"
+            rows.append((media, "frame", col, int(usage[col]), storage))
+        for name, values in getattr(catalog, f'{media}_columns').items():
+            storage = _storage(values)
+            size = values.nbytes if storage == "mmap" else deep_sizeof(values)
+            rows.append((media, "kolom filter", name, size, storage))
+        texts = getattr(catalog, f'{media}_texts', None)
+        if texts is not None:
+            rows.append((media, "teks panjang", "data", texts.size, _storage(texts.data)))
+            for col, spans in texts.spans.items():
+                rows.append((media, "teks panjang", f"spans:{col}", spans.nbytes, _storage(spans)))
+        rows.append((media, "indeks", "id -> baris", *_index_size(getattr(catalog, f'{media}_rows'))))
+        hashes = getattr(catalog, f'{media}_hashes', None)
+        if hashes is not None:
+            rows.append((media, "indeks", "hash baris", hashes.nbytes, _storage(hashes)))
+        for name in ('neighbors', 'neighbor_scores'):
+            values = getattr(catalog, f'{media}_{name}', None)
+            if values is not None:
+                rows.append((media, "indeks", f"mirip:{name}", values.nbytes, _storage(values)))
+    rows.append(("audiobook", "indeks", "tabel bab", *_index_size(catalog.chapters)))
+    index = catalog.chapter_index
+    if hasattr(index, 'nbytes'):
+        rows.append(("audiobook", "indeks bab", "array", index.nbytes, "mmap"))
+    for name in ('entries', 'postings', 'vocabulary', 'by_audiobook'):
+        if not hasattr(index, 'nbytes') and hasattr(index, name):
+            rows.append(("audiobook", "indeks bab", name, deep_sizeof(getattr(index, name)), "heap"))
+    return pd.DataFrame(rows, columns=["media", "bagian", "nama", "bytes", "penyimpanan"])
+
+# Function to get the session_state of every live session, or None when not running under a server
+def live_session_states():
+    try:
+        from streamlit.runtime import Runtime
+        # Internal API: Streamlit has no public way to list sessions
+        session_mgr = Runtime.instance()._session_mgr
+        return {info.session.id: info.session.session_state.filtered_state
+                for info in session_mgr.list_active_sessions()}
+    except Exception:
+        return None
+
+def prefetch_cache_bytes():
+    with prefetch._lock:
+        cards = list(prefetch._card_cache.items())
+    return deep_sizeof(cards), len(cards)
+
+# Current and peak resident set size of this process in bytes
+def process_rss():
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        pass
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    return current, peak
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
@@ -1,8 +1,17 @@
 import streamlit as st
-from database import get_audiobooks
+from database import PROVIDER_LABELS, get_catalog, seconds_to_time, time_to_seconds
+from filters import all_rows, search_rows, facet_options, present_values, facet_rows, isin_rows, range_rows, year_bounds, value_bounds, minute_bounds, sorted_range_rows
+from result_cache import FilterCache
+from facet_picker import facet_picker
+from prefetch import card_html, prefetch_page, image_prefetch_html
+from timing import start_timing, report_first_render
+from profiling import profile_rerun, profiling_panel
+from cards import image_url
 import pandas as pd
 import math
-import re
+
+# Profile this rerun instead when an admin armed profiling for the session
+profile_rerun(__file__)
 
 st.set_page_config(
     page_title="Audiobook",
@@ -10,6 +19,10 @@ st.set_page_config(
     layout="wide"
 )
 
+# Timing spans for this rerun (SELIRA_TIMING=1 or ?timing=1), no-ops otherwise
+timer = start_timing("audiobook")
+profiling_panel()
+
 # Initialize session state for pagination and audio playback
 if 'page_number' not in st.session_state:
     st.session_state.page_number = 1
@@ -17,37 +30,6 @@ if 'page_number' not in st.session_state:
 if 'selected_audiobook' not in st.session_state:
     st.session_state.selected_audiobook = None
 
-# Function to parse timestamps from string
-def parse_timestamps(timestamp_str):
-    if not timestamp_str or pd.isna(timestamp_str):
-        return []
-    
-    # Regular expression to match timestamp patterns like "00:00:00 TITLE"
-    pattern = r'(\d{2}:\d{2}:\d{2})\s+(.+?)(?=\s+\d{2}:\d{2}:\d{2}|\Z)'
-    matches = re.findall(pattern, timestamp_str)
-    
-    # If no matches found but there's content, check if it starts with "DAFTAR ISI"
-    if not matches and "DAFTAR ISI" in timestamp_str:
-        # Split by "DAFTAR ISI" and use the pattern on the remainder
-        parts = timestamp_str.split("DAFTAR ISI", 1)
-        if len(parts) > 1:
-            matches = re.findall(pattern, parts[1])
-    
-    return matches
-
-# Function to convert HH:MM:SS to seconds
-def time_to_seconds(time_str):
-    if not time_str:
-        return 0
-    
-    parts = time_str.split(':')
-    if len(parts) == 3:
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds = int(parts[2])
-        return hours * 3600 + minutes * 60 + seconds
-    return 0
-
 # Function to play audio
 def play_audio(audiobook_id, embed_url, title, timestamp=None):
     st.session_state.selected_audiobook = {
@@ -57,14 +39,6 @@ def play_audio(audiobook_id, embed_url, title, timestamp=None):
         'timestamp': timestamp  # Store the selected timestamp
     }
 
-# Search function
-def search_audiobooks(df, query):
-    if not query:
-        return df
-    query = query.lower()
-    return df[df.apply(lambda row: any(query in str(row[col]).lower() 
-                                     for col in ['title', 'author', 'narrator', 'genres', 'language']), axis=1)]
-
 # Layout with search at top left
 col1, col2 = st.columns([3, 1])
 with col1:
@@ -72,221 +46,109 @@ with col1:
 with col2:
     search_query = st.text_input("🔍 Cari Audiobook", placeholder="Judul, penulis, narator...")
 
+# One catalog version for the whole rerun, even if the watcher swaps in a newer one meanwhile
+with st.spinner('Memuat data audiobook...'), timer.span("load"):
+    catalog = get_catalog()
+
+# Deep link (?play=<id>), e.g. from the search on Home: open the player once, then drop the parameter
+if 'play' in st.query_params:
+    deep_link_id = catalog.resolve_id('audiobook', st.query_params['play'])
+    del st.query_params['play']
+    if deep_link_id is None:
+        st.warning("Audiobook dari tautan tidak ditemukan.")
+    else:
+        deep_link_audiobook = catalog.get_audiobook(deep_link_id)
+        play_audio(deep_link_id, deep_link_audiobook['embed_url'], deep_link_audiobook['title'])
+
+# A catalog reload may have removed (or re-ided) the open audiobook since it was selected
+if st.session_state.selected_audiobook and catalog.get_audiobook(st.session_state.selected_audiobook['id']) is None:
+    st.session_state.selected_audiobook = None
+    st.warning("Audiobook yang sedang diputar tidak ditemukan lagi di katalog.")
+
 # Display audio player if an audiobook is selected
 if st.session_state.selected_audiobook:
     audiobook = st.session_state.selected_audiobook
     st.markdown(f"<h3 style='text-align: center;'>{audiobook['title']}</h3>", unsafe_allow_html=True)
     
-    # Get the audiobook's timestamp data
-    audiobooks_df = get_audiobooks()
-    current_audiobook = audiobooks_df[audiobooks_df['id'] == audiobook['id']].iloc[0] if not audiobooks_df.empty else None
-    
-    # Parse timestamps if available
-    timestamps = []
-    if current_audiobook is not None and 'timestamp' in current_audiobook and pd.notna(current_audiobook['timestamp']):
-        timestamps = parse_timestamps(current_audiobook['timestamp'])
+    # Chapter table (seconds, title, label) parsed once when the catalog was loaded
+    timestamps = catalog.chapters.get(audiobook['id'], ())
     
     # Generate a unique key for the player
     player_key = f"player_{audiobook['id']}"
-    timestamp_dropdown_key = f"timestamp_dropdown_{audiobook['id']}"
     
     audio_container = st.container()
-    with audio_container:
+    with audio_container, timer.span("player"):
         if audiobook['embed_url'] and pd.notna(audiobook['embed_url']):
-            # Handle timestamp parameter
-            embed_url = audiobook['embed_url']
-            timestamp = audiobook.get('timestamp', None)
-            total_seconds = 0
-            
-            # Convert timestamp to seconds if available
-            if timestamp:
-                total_seconds = time_to_seconds(timestamp)
-            
-            # For Spotify
-            if "spotify.com" in embed_url:
-                # Create a list of timestamps for the dropdown
-                timestamp_options = []
-                for time_str, title in timestamps:
-                    seconds = time_to_seconds(time_str)
-                    timestamp_options.append((seconds, f"{title} ({time_str})"))
-                
-                # If timestamps are available, create a dropdown
-                if timestamp_options:
-                    # Find the index of the currently selected timestamp
-                    current_index = 0
-                    if timestamp:
-                        for i, (sec, _) in enumerate(timestamp_options):
-                            if sec == total_seconds:
-                                current_index = i
-                                break
-                    
-                    # Create the dropdown
-                    selected_option = st.selectbox(
-                        "Daftar Isi / Navigasi Bab:",
-                        options=timestamp_options,
-                        format_func=lambda x: x[1],
-                        index=current_index,
-                        key=timestamp_dropdown_key
-                    )
-                    
-                    # Update the total_seconds if selection changed
-                    if selected_option[0] != total_seconds:
-                        total_seconds = selected_option[0]
-                        timestamp = selected_option[1].split(' (')[-1].rstrip(')')
-                
-                # If the embed URL doesn't have a t parameter, add it
-                if "?t=" not in embed_url and "&t=" not in embed_url:
-                    if "?" in embed_url:
-                        embed_url += f"&t={total_seconds}"
-                    else:
-                        embed_url += f"?t={total_seconds}"
+            # Start at the requested chapter, otherwise resume from the last reported position.
+            # It is fixed when the player opens so later position reports don't rebuild the player.
+            if 'start' not in audiobook:
+                timestamp = audiobook.get('timestamp', None)
+                if timestamp:
+                    audiobook['start'] = time_to_seconds(timestamp)
                 else:
-                    # Replace existing t parameter
-                    embed_url = re.sub(r'([?&])t=\d+', f'\\1t={total_seconds}', embed_url)
-                
-                # Create a unique iframe ID for JavaScript targeting
-                iframe_id = f"spotify_iframe_{audiobook['id']}"
-                
-                # Render the Spotify iframe
-                st.markdown(f"""
-                <iframe id="{iframe_id}" 
-                        src="{embed_url}" 
-                        width="100%" 
-                        height="152" 
-                        frameborder="0" 
-                        allowtransparency="true" 
-                        allow="encrypted-media"
-                        style="border-radius: 10px; margin: 10px 0;">
-                </iframe>
-                
-                <script>
-                // Function to navigate to a specific timestamp in Spotify player
-                function navigateToSpotifyTimestamp(iframe_id, seconds) {{
-                    // Get the iframe element
-                    const iframe = document.getElementById(iframe_id);
-                    if (!iframe) return;
-                    
-                    // Get the current src
-                    let src = iframe.src;
-                    
-                    // Update or add the timestamp parameter
-                    if (src.includes('t=')) {{
-                        src = src.replace(/([?&])t=\\d+/, '$1t=' + seconds);
-                    }} else if (src.includes('?')) {{
-                        src += '&t=' + seconds;
-                    }} else {{
-                        src += '?t=' + seconds;
-                    }}
-                    
-                    // Update the iframe src
-                    iframe.src = src;
-                }}
-                
-                // Initial navigation to timestamp
-                window.addEventListener('load', function() {{
-                    setTimeout(function() {{
-                        navigateToSpotifyTimestamp('{iframe_id}', {total_seconds});
-                    }}, 1000);
-                }});
-                </script>
-                """, unsafe_allow_html=True)
-                
-                # # Create a button to manually navigate to the timestamp
-                # if timestamp:
-                #     if st.button(f"Navigasi ke {timestamp}", key=f"nav_btn_{audiobook['id']}"):
-                #         # This will trigger a rerun with the updated timestamp
-                #         st.session_state.selected_audiobook['timestamp'] = timestamp
-                #         st.rerun()
-            
-            # For SoundCloud
-            elif "soundcloud.com" in embed_url:
-                # SoundCloud supports timestamp with #t parameter
-                timestamp_param = f"&auto_play=true#t={total_seconds}s" if timestamp else ""
-                
-                # Make sure the URL has the correct format for embedding
-                if "api.soundcloud.com/tracks" not in embed_url:
-                    # If it's a direct SoundCloud URL, convert it to embed format
-                    track_id = embed_url.split('/')[-1]
-                    embed_url = f"https://w.soundcloud.com/player/?url=https%3A//api.soundcloud.com/tracks/{track_id}"
-                
-                # Display the timestamp dropdown if available
-                if timestamps:
-                    timestamp_options = [(time_to_seconds(time_str), f"{title} ({time_str})") for time_str, title in timestamps]
-                    selected_option = st.selectbox(
-                        "Daftar Isi / Navigasi Bab:",
-                        options=timestamp_options,
-                        format_func=lambda x: x[1],
-                        key=timestamp_dropdown_key
-                    )
-                    
-                    # Update timestamp if selection changed
-                    if selected_option and selected_option[0] != total_seconds:
-                        total_seconds = selected_option[0]
-                        timestamp_param = f"&auto_play=true#t={total_seconds}s"
-                        st.session_state.selected_audiobook['timestamp'] = selected_option[1].split(' (')[-1].rstrip(')')
-                        st.rerun()
-                
-                st.markdown(f"""
-                <iframe width="100%" 
-                        height="166" 
-                        scrolling="no" 
-                        frameborder="no" 
-                        allow="autoplay"
-                        src="{embed_url}{timestamp_param}"
-                        style="border-radius: 10px; margin: 10px 0;">
-                </iframe>
-                """, unsafe_allow_html=True)
+                    audiobook['start'] = st.session_state.get('audiobook_positions', {}).get(audiobook['id'], 0)
             
-            # For HTML5 audio (direct MP3 links)
-            else:
-                # Display the timestamp dropdown if available
-                if timestamps:
-                    timestamp_options = [(time_to_seconds(time_str), f"{title} ({time_str})") for time_str, title in timestamps]
-                    selected_option = st.selectbox(
-                        "Daftar Isi / Navigasi Bab:",
-                        options=timestamp_options,
-                        format_func=lambda x: x[1],
-                        key=timestamp_dropdown_key
-                    )
-                    
-                    # Update timestamp if selection changed
-                    if selected_option and selected_option[0] != total_seconds:
-                        total_seconds = selected_option[0]
-                        st.session_state.selected_audiobook['timestamp'] = selected_option[1].split(' (')[-1].rstrip(')')
-                        st.rerun()
-                
-                # Create a unique ID for the audio element
-                audio_id = f"audio_{audiobook['id']}"
-                
-                # Render the audio element with custom HTML and JS for timestamp control
-                st.markdown(f"""
-                <audio id="{audio_id}" controls style="width: 100%;">
-                    <source src="{embed_url}" type="audio/mp3">
-                    Your browser does not support the audio element.
-                </audio>
-                
-                <script>
-                    document.addEventListener("DOMContentLoaded", function() {{
-                        var audio = document.getElementById("{audio_id}");
-                        if (audio) {{
-                            audio.currentTime = {total_seconds};
-                            audio.play();
-                        }}
-                    }});
-                </script>
-                """, unsafe_allow_html=True)
+            # Spotify, SoundCloud and HTML5 audio all seek between chapters in the browser.
+            # Imported on demand: nothing before the first play needs the component.
+            from audio_player import audio_player
+            audiobook_row = catalog.get_audiobook(audiobook['id'])
+            audio_player(
+                audiobook['id'],
+                audiobook_row['provider'],
+                audiobook_row['embed_base'],
+                audiobook_row['track_id'],
+                timestamps,
+                start=audiobook['start'],
+                key=player_key
+            )
         else:
             st.warning("Tidak ada tautan audio untuk audiobook ini.")
     
     if st.button("❌ Tutup Audio"):
         st.session_state.selected_audiobook = None
         st.rerun()
+
+    
+    # "Mirip dengan ini": neighbors precomputed when the catalog was built
+    with timer.span("similar"):
+        similar_audiobooks = catalog.similar('audiobook', audiobook['id'], limit=5)
+    if not similar_audiobooks.empty:
+        st.markdown("#### Mirip dengan ini")
+        similar_cols = st.columns(5)
+        for col, (_, similar) in zip(similar_cols, similar_audiobooks.iterrows()):
+            with col:
+                cover_url = image_url(similar.get('cover', ''))
+                if cover_url:
+                    st.markdown(f'<img src="{cover_url}" style="width:100%; aspect-ratio:1/1; object-fit:cover; border-radius:8px;" loading="lazy">', unsafe_allow_html=True)
+                st.caption(similar['title'])
+                similar_embed = similar.get('embed_url', '')
+                if pd.notna(similar_embed) and similar_embed != '':
+                    if st.button("▶️ Putar", key=f"similar_{similar['id']}", use_container_width=True):
+                        play_audio(similar['id'], similar_embed, similar['title'])
+                        st.rerun()
     
     st.markdown("---")
 
+# Chapters across the whole catalog that match the search, straight from the chapter index
+if search_query:
+    with timer.span("chapter_search"):
+        chapter_hits = catalog.chapter_index.search(search_query, limit=10)
+    if chapter_hits:
+        with st.expander(f"🔖 Bab yang cocok ({len(chapter_hits)})", expanded=True):
+            for i, (hit_id, hit_seconds, hit_title) in enumerate(chapter_hits):
+                hit_audiobook = catalog.get_audiobook(hit_id)
+                hit_time = seconds_to_time(hit_seconds)
+                col1, col2 = st.columns([5, 1])
+                with col1:
+                    st.markdown(f"**{hit_audiobook['title']}** — {hit_title} ({hit_time})")
+                with col2:
+                    if st.button("▶️ Putar", key=f"chapter_hit_{i}", use_container_width=True):
+                        play_audio(hit_id, hit_audiobook['embed_url'], hit_audiobook['title'], timestamp=hit_time)
+                        st.rerun()
+
 # Rest of the code remains the same (filters, pagination, display grid)
-with st.spinner('Memuat data audiobook...'):
-    audiobooks_df = get_audiobooks()
+audiobooks_df = catalog.audiobooks
+columns = catalog.audiobook_columns
 
 if audiobooks_df.empty:
     st.error("""
@@ -297,152 +159,148 @@ if audiobooks_df.empty:
     """)
     st.stop()
 
-# Process data
+# Process data. Filters narrow down an array of row ids over the shared
+# catalog; DataFrame rows are only materialized for the visible page.
 try:
-    # Apply search filter first
-    if search_query:
-        audiobooks_df = search_audiobooks(audiobooks_df, search_query)
-    
-    # Convert year to integer with proper NaN handling
-    if 'year' in audiobooks_df.columns:
-        # First convert to numeric, coerce errors to NaN
-        audiobooks_df['year'] = pd.to_numeric(audiobooks_df['year'], errors='coerce')
-        # Fill NaN values with 0
-        audiobooks_df['year'] = audiobooks_df['year'].fillna(0)
-        # Convert to integer
-        audiobooks_df['year'] = audiobooks_df['year'].astype(int)
+    rows = all_rows(audiobooks_df)
+    # Every stage below is reused from the previous rerun while its inputs are unchanged
+    cache = FilterCache('audiobook', catalog.version)
     
-    # Add index as audiobook_id if not present
-    if 'id' not in audiobooks_df.columns:
-        audiobooks_df['id'] = audiobooks_df.index
+    # Apply search filter first
+    if search_query and 'search' in columns:
+        with timer.span("search"):
+            rows = cache.narrow('search', search_query, lambda: search_rows(columns['search'], rows, search_query))
     
     # Sidebar filters
     st.sidebar.header("Filter Audiobook")
+    st.sidebar.caption(f"Katalog versi {catalog.version}")
 
-    # Language Filter
-    if 'language' in audiobooks_df.columns:
-        all_languages = set()
-        for languages in audiobooks_df['language'].str.split(','):
-            if isinstance(languages, list):
-                all_languages.update([c.strip() for c in languages if c.strip()])
-        selected_languages = st.sidebar.multiselect(
-            "Bahasa",
-            options=sorted(all_languages),
-            default=[]
-        )
-        if selected_languages:
-            audiobooks_df = audiobooks_df[audiobooks_df['language'].apply(
-                lambda x: any(language in str(x) for language in selected_languages) if pd.notna(x) else False
-            )]
+    # Optional batched mode: the filters live in a form, so any number of changes
+    # costs one rerun when "Terapkan filter" is pressed. Widget state is per page, so the
+    # preference is kept in a plain session key that both pages read back.
+    def remember_batch_filters():
+        st.session_state.batch_filters = st.session_state.batch_filters_toggle
 
-    # Genre filter
-    if 'genres' in audiobooks_df.columns:
-        all_genres = set()
-        for genres in audiobooks_df['genres'].str.split(','):
-            if isinstance(genres, list):
-                all_genres.update([g.strip() for g in genres])
-        selected_genres = st.sidebar.multiselect(
-            "Genre",
-            options=sorted(all_genres),
-            default=[]
-        )
-        if selected_genres:
-            audiobooks_df = audiobooks_df[audiobooks_df['genres'].apply(
-                lambda x: any(genre in str(x) for genre in selected_genres) if pd.notna(x) else False
-            )]
+    batch_filters = st.sidebar.toggle("Terapkan filter sekaligus", value=st.session_state.get('batch_filters', False),
+                                      key="batch_filters_toggle", on_change=remember_batch_filters,
+                                      help="Kumpulkan perubahan filter dan jalankan sekali dengan tombol Terapkan")
+    filter_box = st.sidebar.form("audiobook_filters", border=False) if batch_filters else st.sidebar.container()
 
-    # Authors filter
-    if 'author' in audiobooks_df.columns:
-        all_authors = set()
-        for authors in audiobooks_df['author'].str.split(','):
-            if isinstance(authors, list):
-                all_authors.update([d.strip() for d in authors])
-        selected_authors = st.sidebar.multiselect(
-            "Penulis",
-            options=sorted(all_authors),
-            default=[]
-        )
-        if selected_authors:
-            audiobooks_df = audiobooks_df[audiobooks_df['author'].apply(
-                lambda x: any(author in str(x) for author in selected_authors) if pd.notna(x) else False
-            )]
+    # Options and slider bounds follow the rows left by the filters above them. In
+    # batched mode they come from the search result only, so staged selections are
+    # still valid options when the form is submitted; the mode is therefore one of
+    # their cache inputs.
+    search_result = rows
+    def option_rows():
+        return search_result if batch_filters else rows
 
-    # Narrator filter
-    if 'narrator' in audiobooks_df.columns:
-        all_narrators = set()
-        for narrators in audiobooks_df['narrator'].str.split(','):
-            if isinstance(narrators, list):
-                all_narrators.update([a.strip() for a in narrators])
-        selected_narrators = st.sidebar.multiselect(
-            "Narator",
-            options=sorted(all_narrators),
-            default=[]
-        )
-        if selected_narrators:
-            audiobooks_df = audiobooks_df[audiobooks_df['narrator'].apply(
-                lambda x: any(narrator in str(x) for narrator in selected_narrators) if pd.notna(x) else False
-            )]
+    # Bahasa, genre, penulis and narator filters
+    for column, label in [('language', "Bahasa"), ('genres', "Genre"),
+                          ('author', "Penulis"), ('narrator', "Narator")]:
+        if column in columns:
+            with timer.span(f"filter:{column}"):
+                if column in ('author', 'narrator'):
+                    # High-cardinality: top names plus server-side prefix search
+                    selected = facet_picker(label, columns[f'{column}_tokens'], option_rows(), key=f"facet_{column}", cache=cache,
+                                            container=filter_box)
+                else:
+                    selected = filter_box.multiselect(
+                        label,
+                        options=cache.derive(f"options:{column}", (batch_filters,), lambda: facet_options(columns[f'{column}_tokens'], option_rows())),
+                        default=[]
+                    )
+                rows = cache.narrow(f"facet:{column}", tuple(selected), lambda: facet_rows(columns[column], rows, selected))
     
-    # Year filter with NaN handling
-    if 'year' in audiobooks_df.columns:
-        valid_years = audiobooks_df[audiobooks_df['year'] != 0]['year']
-        
-        if not valid_years.empty:
-            min_year = int(valid_years.min())
-            max_year = int(valid_years.max())
-            
-            if min_year == max_year:
-                min_year = max(1900, min_year - 1)
-                max_year = min(2100, max_year + 1)
-            
-            year_range = st.sidebar.slider(
-                "Rentang Tahun",
-                min_value=min_year,
-                max_value=max_year,
-                value=(min_year, max_year)
+    # Provider filter, classified when the catalog was loaded
+    if 'provider' in columns:
+        with timer.span("filter:provider"):
+            present = cache.derive("present:provider", (batch_filters,), lambda: present_values(columns['provider'], option_rows()))
+            selected_providers = filter_box.multiselect(
+                "Platform",
+                options=[p for p in PROVIDER_LABELS if p in present],
+                format_func=PROVIDER_LABELS.get,
+                default=[]
             )
+            rows = cache.narrow("provider", tuple(selected_providers),
+                                lambda: isin_rows(columns['provider'], rows, selected_providers))
+    
+    # Year filter with NaN handling (year 0 = unknown, always kept)
+    if 'year' in columns:
+        with timer.span("filter:year"):
+            bounds = cache.derive("bounds:year", (batch_filters,), lambda: year_bounds(columns['year'], option_rows()))
+            
+            if bounds is not None:
+                min_year, max_year = bounds
+                
+                if min_year == max_year:
+                    min_year = max(1900, min_year - 1)
+                    max_year = min(2100, max_year + 1)
+                
+                year_range = filter_box.slider(
+                    "Rentang Tahun",
+                    min_value=min_year,
+                    max_value=max_year,
+                    value=(min_year, max_year)
+                )
 
-            audiobooks_df = audiobooks_df[
-                (audiobooks_df['year'] == 0) | 
-                ((audiobooks_df['year'] >= year_range[0]) & 
-                (audiobooks_df['year'] <= year_range[1]))
-            ]
-        else:
-            st.sidebar.warning("Tidak ada data tahun yang valid untuk difilter")
+                rows = cache.narrow("year", year_range,
+                                    lambda: range_rows(columns['year'], rows, year_range[0], year_range[1], keep_zero=True))
+            else:
+                filter_box.warning("Tidak ada data tahun yang valid untuk difilter")
+    
+    # Duration filter in minutes, looked up in the sorted duration index of the catalog.
+    # At the full range nothing is filtered, so audiobooks without a duration stay listed.
+    if 'duration_seconds' in columns:
+        with timer.span("filter:duration"):
+            bounds = cache.derive("bounds:duration", (batch_filters,), lambda: minute_bounds(columns['duration_seconds'], option_rows()))
+            if bounds is not None:
+                min_minutes, max_minutes = bounds
+                if min_minutes == max_minutes:
+                    max_minutes = min_minutes + 1
+                duration_range = filter_box.slider(
+                    "Durasi (menit)",
+                    min_value=min_minutes,
+                    max_value=max_minutes,
+                    value=(min_minutes, max_minutes)
+                )
+                if duration_range != (min_minutes, max_minutes):
+                    rows = cache.narrow("duration", duration_range, lambda: sorted_range_rows(
+                        catalog.duration_index, len(audiobooks_df), rows, duration_range[0] * 60, duration_range[1] * 60))
     
     # Rating filter
-    if 'goodreads_rating' in audiobooks_df.columns:
-        min_rating = float(audiobooks_df['goodreads_rating'].min())
-        max_rating = float(audiobooks_df['goodreads_rating'].max())
-        
-        if min_rating == max_rating:
-            if min_rating > 0:
-                min_rating = max(0.0, min_rating - 0.5)
-                max_rating = min(5.0, max_rating + 0.5)
-            else:
-                min_rating = 0.0
-                max_rating = 1.0
-        
-        rating_range = st.sidebar.slider(
-            "Rentang Rating",
-            min_value=min_rating,
-            max_value=max_rating,
-            value=(min_rating, max_rating),
-            step=0.1
-        )
-        audiobooks_df = audiobooks_df[
-            (audiobooks_df['goodreads_rating'] >= rating_range[0]) & 
-            (audiobooks_df['goodreads_rating'] <= rating_range[1])
-        ]
+    if 'goodreads_rating' in columns and option_rows().size:
+        with timer.span("filter:goodreads_rating"):
+            min_rating, max_rating = cache.derive("bounds:goodreads_rating", (batch_filters,), lambda: value_bounds(columns['goodreads_rating'], option_rows()))
+            
+            if min_rating == max_rating:
+                if min_rating > 0:
+                    min_rating = max(0.0, min_rating - 0.5)
+                    max_rating = min(5.0, max_rating + 0.5)
+                else:
+                    min_rating = 0.0
+                    max_rating = 1.0
+            
+            rating_range = filter_box.slider(
+                "Rentang Rating",
+                min_value=min_rating,
+                max_value=max_rating,
+                value=(min_rating, max_rating),
+                step=0.1
+            )
+            rows = cache.narrow("goodreads_rating", rating_range,
+                                lambda: range_rows(columns['goodreads_rating'], rows, rating_range[0], rating_range[1]))
+
+    if batch_filters:
+        filter_box.form_submit_button("✅ Terapkan filter", use_container_width=True)
 
     # Check if no audiobooks match filters
-    if len(audiobooks_df) == 0:
+    if len(rows) == 0:
         st.warning("Tidak ada audiobook yang sesuai dengan kriteria filter")
         st.stop()
     
     # Pagination
     items_per_page = st.session_state.get('items_per_page', 10)
-    total_pages = max(1, math.ceil(len(audiobooks_df) / items_per_page))
+    total_pages = max(1, math.ceil(len(rows) / items_per_page))
     
     # Ensure page_number doesn't exceed total_pages after filtering
     if st.session_state.page_number > total_pages:
@@ -578,74 +436,72 @@ try:
             border-radius: 10px;
             overflow: hidden;
         }
-        
-        /* Timestamp navigation dropdown styling */
-        .timestamp-dropdown {
-            margin-bottom: 15px;
-            border-radius: 8px;
-            border: 1px solid #ddd;
-        }
+
     </style>
     """, unsafe_allow_html=True)
     
     # Top pagination with items per page selector
-    with pagination_top:
+    with pagination_top, timer.span("pagination_top"):
         col1, col2, col3 = st.columns([0.4, 0.3, 0.3])
         with col1:
-            st.write(f"Menampilkan {len(audiobooks_df)} audiobook")
-        with col2:
-            items_options = [10, 15, 20, 25]
-            selected_items = st.selectbox(
-                "Audiobook per halaman",
-                options=items_options,
-                index=items_options.index(items_per_page) if items_per_page in items_options else 0,
-                key="items_per_page_select"
-            )
+            st.write(f"Menampilkan {len(rows)} audiobook")
+            infinite_scroll = st.toggle("Gulir tak terbatas", key="infinite_scroll")
+        if not infinite_scroll:
+            with col2:
+                items_options = [10, 15, 20, 25]
+                selected_items = st.selectbox(
+                    "Audiobook per halaman",
+                    options=items_options,
+                    index=items_options.index(items_per_page) if items_per_page in items_options else 0,
+                    key="items_per_page_select"
+                )
             
-            if selected_items != items_per_page:
-                st.session_state.items_per_page = selected_items
-                st.session_state.page_number = 1
-                st.rerun()
+                if selected_items != items_per_page:
+                    st.session_state.items_per_page = selected_items
+                    st.session_state.page_number = 1
+                    st.rerun()
             
-        with col3:
-            page_input = st.number_input(
-                "Halaman",
-                min_value=1,
-                max_value=total_pages,
-                value=st.session_state.page_number,
-                key="page_input_top"
+            with col3:
+                page_input = st.number_input(
+                    "Halaman",
+                    min_value=1,
+                    max_value=total_pages,
+                    value=st.session_state.page_number,
+                    key="page_input_top"
+                )
+                if page_input != st.session_state.page_number:
+                    st.session_state.page_number = page_input
+                    st.rerun()
+    
+    # Virtualized infinite-scroll grid replaces the number-input pagination
+    if infinite_scroll:
+        # Imported on demand: the first paint uses the paginated grid
+        from infinite_grid import infinite_grid, dataset_token
+        with audiobook_grid, timer.span("grid"):
+            infinite_grid(
+                'audiobook',
+                audiobooks_df,
+                rows,
+                dataset_token(catalog.version, rows),
+                lambda audiobook: play_audio(audiobook['id'], audiobook['embed_url'], audiobook['title']),
+                key="audiobook_infinite_grid"
             )
-            if page_input != st.session_state.page_number:
-                st.session_state.page_number = page_input
-                st.rerun()
+        report_first_render("audiobook")
+        st.stop()
     
     # Calculate indices for the audiobooks to display
     start_idx = (st.session_state.page_number - 1) * items_per_page
-    end_idx = min(start_idx + items_per_page, len(audiobooks_df))
-    paged_audiobooks = audiobooks_df.iloc[start_idx:end_idx]
+    end_idx = min(start_idx + items_per_page, len(rows))
+    paged_audiobooks = audiobooks_df.iloc[rows[start_idx:end_idx]]
+    data_version = catalog.version
     
     # Display audiobook grid with improved layout and clickable titles
-    with audiobook_grid:
+    with audiobook_grid, timer.span("grid"):
         # Create rows with 5 columns each
         cols_per_row = 5
-        rows = math.ceil(len(paged_audiobooks) / cols_per_row)
+        grid_rows = math.ceil(len(paged_audiobooks) / cols_per_row)
         
-        # Dictionary mapping language names to flag emojis
-        language_to_flag = {
-            'English': '🇬🇧', 'Inggris': '🇬🇧',
-            'Indonesian': '🇮🇩', 'Indonesia': '🇮🇩',
-            'French': '🇫🇷', 'Prancis': '🇫🇷',
-            'Japanese': '🇯🇵', 'Jepang': '🇯🇵',
-            'German': '🇩🇪', 'Jerman': '🇩🇪',
-            'Spanish': '🇪🇸', 'Spanyol': '🇪🇸',
-            'Chinese': '🇨🇳', 'Mandarin': '🇨🇳',
-            'Korean': '🇰🇷', 'Korea': '🇰🇷',
-            'Russian': '🇷🇺', 'Rusia': '🇷🇺',
-            'Arabic': '🇸🇦', 'Arab': '🇸🇦',
-            # Add more languages as needed
-        }
-        
-        for row in range(rows):
+        for row in range(grid_rows):
             cols = st.columns(cols_per_row)
             
             for col in range(cols_per_row):
@@ -656,48 +512,13 @@ try:
                         # Get audiobook data with fallbacks
                         audiobook_id = audiobook.get('id', idx)
                         title = audiobook.get('title', 'Judul tidak tersedia')
-                        year = audiobook.get('year', 0)
-                        year_display = year if year != 0 else 'Tidak tersedia'
-                        cover_url = audiobook.get('cover', '')
-                        rating = audiobook.get('goodreads_rating', 'N/A')
-                        description = audiobook.get('description', 'Deskripsi tidak tersedia')
-                        author = audiobook.get('author', 'Tidak tersedia')
-                        narrator = audiobook.get('narrator', 'Tidak tersedia')
-                        genres = audiobook.get('genres', 'Tidak tersedia')
-                        language = audiobook.get('language', 'Tidak tersedia')
                         embed_url = audiobook.get('embed_url', '')
-                        duration = audiobook.get('duration', 'Tidak tersedia')
                         
                         # Check if embed URL is available
                         has_audio = pd.notna(embed_url) and embed_url != ''
                         
-                        # Process language flag
-                        language_flag = ''
-                        if language != 'Tidak tersedia':
-                            languages = [c.strip() for c in str(language).split(',')]
-                            for c in languages:
-                                if c in language_to_flag:
-                                    language_flag += language_to_flag[c] + ' '
-                        
-                        html = f"""
-                        <div class="audiobook-card">
-                            <div class="cover-container">
-                                {'<img src="' + str(cover_url) + '" class="audiobook-cover" alt="' + title + '" title="' + title + '">' if pd.notna(cover_url) and str(cover_url).startswith('http') else '<div style="text-align: center; color: #888;">Cover tidak tersedia</div>'}
-                            </div>
-                            <div class="audiobook-title" title="{title} ({year_display})">{title} ({year_display})</div>
-                            <div class="audiobook-details">
-                                <div class="audiobook-rating">
-                                    <span>⭐ {rating}/5</span>
-                                    <span class="language-flag">{language_flag}</span>
-                                </div>
-                                <div><strong>Durasi:</strong> {duration}</div>
-                                <div><strong>Genre:</strong> {genres}</div>
-                                <div><strong>Penulis:</strong> {author}</div>
-                                <div><strong>Narator:</strong> {narrator}</div>
-                            </div>
-                        </div>
-                        """
-                        st.markdown(html, unsafe_allow_html=True)
+                        # Audiobook card HTML, prebuilt in the background when this page was prefetched
+                        st.markdown(card_html('audiobook', data_version, audiobook_id, audiobook), unsafe_allow_html=True)
                         
                         # Hidden button to handle the click event
                         if has_audio:
@@ -707,11 +528,17 @@ try:
                         
                         # Detail expander with scrollable content
                         with st.expander("Deskripsi"):
+                            description = catalog.get_text('audiobook', audiobook_id, 'description') or 'Deskripsi tidak tersedia'
                             st.markdown(f'<div class="detail-text">{description}</div>', unsafe_allow_html=True)
     
+    # Prefetch the next page: build its cards on the background pool and warm the cover cache
+    next_audiobooks = audiobooks_df.iloc[rows[end_idx:end_idx + items_per_page]]
+    prefetch_page('audiobook', data_version, next_audiobooks)
+    st.markdown(image_prefetch_html('audiobook', next_audiobooks), unsafe_allow_html=True)
+    
     # Bottom pagination
-    with pagination_bottom:
-        total_items = len(audiobooks_df)
+    with pagination_bottom, timer.span("pagination_bottom"):
+        total_items = len(rows)
         showing_start = start_idx + 1
         showing_end = end_idx
         
@@ -743,3 +570,5 @@ try:
 
 except Exception as e:
     st.error(f"Error memproses data: {str(e)}")
+
+report_first_render("audiobook")
@@ -1,14 +1,28 @@
 import streamlit as st
-from database import get_films
+from database import PROVIDER_LABELS, get_catalog
+from filters import all_rows, search_rows, facet_options, present_values, facet_rows, isin_rows, range_rows, year_bounds, value_bounds
+from result_cache import FilterCache
+from facet_picker import facet_picker
+from prefetch import card_html, prefetch_page, image_prefetch_html
+from timing import start_timing, report_first_render
+from profiling import profile_rerun, profiling_panel
+from cards import image_url
 import pandas as pd
 import math
 
+# Profile this rerun instead when an admin armed profiling for the session
+profile_rerun(__file__)
+
 st.set_page_config(
     page_title="Film",
     page_icon="🎬",
     layout="wide"
 )
 
+# Timing spans for this rerun (SELIRA_TIMING=1 or ?timing=1), no-ops otherwise
+timer = start_timing("film")
+profiling_panel()
+
 # Initialize session state for pagination and video playback
 if 'page_number' not in st.session_state:
     st.session_state.page_number = 1
@@ -24,14 +38,6 @@ def play_video(film_id, embed_url, title):
         'title': title
     }
 
-# Search function
-def search_films(df, query):
-    if not query:
-        return df
-    query = query.lower()
-    return df[df.apply(lambda row: any(query in str(row[col]).lower() 
-                                     for col in ['title', 'director', 'actors', 'genres', 'country', 'writer']), axis=1)]
-
 # Layout with search at top left
 col1, col2 = st.columns([3, 1])
 with col1:
@@ -39,6 +45,22 @@ with col1:
 with col2:
     search_query = st.text_input("🔍 Cari Film", placeholder="Judul, sutradara, pemain...")
 
+# One catalog version for the whole rerun, even if the watcher swaps in a newer one meanwhile
+with st.spinner('Memuat data film...'), timer.span("load"):
+    catalog = get_catalog()
+    films_df = catalog.films
+    columns = catalog.film_columns
+
+# Deep link (?play=<id>), e.g. from the search on Home: open the player once, then drop the parameter
+if 'play' in st.query_params:
+    deep_link_id = catalog.resolve_id('film', st.query_params['play'])
+    del st.query_params['play']
+    if deep_link_id is None:
+        st.warning("Film dari tautan tidak ditemukan.")
+    else:
+        deep_link_film = catalog.get_film(deep_link_id)
+        play_video(deep_link_id, deep_link_film.get('embed_base', ''), deep_link_film['title'])
+
 # Display video player if a film is selected
 if st.session_state.selected_film:
     film = st.session_state.selected_film
@@ -46,7 +68,7 @@ if st.session_state.selected_film:
     
     # Create a container for the embedded video
     video_container = st.container()
-    with video_container:
+    with video_container, timer.span("player"):
         # If we have an embed URL, display it
         if film['embed_url'] and pd.notna(film['embed_url']):
             # Create an iframe to embed the video
@@ -66,12 +88,27 @@ if st.session_state.selected_film:
         st.session_state.selected_film = None
         st.rerun()
     
+    # "Mirip dengan ini": neighbors precomputed when the catalog was built
+    with timer.span("similar"):
+        similar_films = catalog.similar('film', film['id'], limit=5)
+    if not similar_films.empty:
+        st.markdown("#### Mirip dengan ini")
+        similar_cols = st.columns(5)
+        for col, (_, similar) in zip(similar_cols, similar_films.iterrows()):
+            with col:
+                poster_url = image_url(similar.get('poster', ''))
+                if poster_url:
+                    st.markdown(f'<img src="{poster_url}" style="width:100%; aspect-ratio:2/3; object-fit:cover; border-radius:8px;" loading="lazy">', unsafe_allow_html=True)
+                st.caption(similar['title'])
+                similar_embed = similar.get('embed_base', '')
+                if pd.notna(similar_embed) and similar_embed != '':
+                    if st.button("▶️ Tonton", key=f"similar_{similar['id']}", use_container_width=True):
+                        play_video(similar['id'], similar_embed, similar['title'])
+                        st.rerun()
+    
     # Horizontal line to separate video from film list
     st.markdown("---")
 
-with st.spinner('Memuat data film...'):
-    films_df = get_films()
-
 if films_df.empty:
     st.error("""
     Data film tidak ditemukan. Pastikan:
@@ -81,168 +118,129 @@ if films_df.empty:
     """)
     st.stop()
 
-# Process data
+# Process data. Filters narrow down an array of row ids over the shared
+# catalog; DataFrame rows are only materialized for the visible page.
 try:
-    # Apply search filter first
-    if search_query:
-        films_df = search_films(films_df, search_query)
+    rows = all_rows(films_df)
+    # Every stage below is reused from the previous rerun while its inputs are unchanged
+    cache = FilterCache('film', catalog.version)
     
-    # Convert year to integer with proper NaN handling
-    if 'year' in films_df.columns:
-        # First convert to numeric, coerce errors to NaN
-        films_df['year'] = pd.to_numeric(films_df['year'], errors='coerce')
-        # Fill NaN values with 0
-        films_df['year'] = films_df['year'].fillna(0)
-        # Convert to integer
-        films_df['year'] = films_df['year'].astype(int)
-    
-    # Add index as film_id if not present
-    if 'id' not in films_df.columns:
-        films_df['id'] = films_df.index
+    # Apply search filter first
+    if search_query and 'search' in columns:
+        with timer.span("search"):
+            rows = cache.narrow('search', search_query, lambda: search_rows(columns['search'], rows, search_query))
     
     # Sidebar filters
     st.sidebar.header("Filter Film")
+    st.sidebar.caption(f"Katalog versi {catalog.version}")
 
-    # Negara Filter
-    if 'country' in films_df.columns:
-        all_countries = set()
-        for countries in films_df['country'].str.split(','):
-            if isinstance(countries, list):
-                all_countries.update([c.strip() for c in countries if c.strip()])
-        selected_countries = st.sidebar.multiselect(
-            "Negara",
-            options=sorted(all_countries),
-            default=[]
-        )
-        if selected_countries:
-            films_df = films_df[films_df['country'].apply(
-                lambda x: any(country in str(x) for country in selected_countries) if pd.notna(x) else False
-            )]
+    # Optional batched mode: the filters live in a form, so any number of changes
+    # costs one rerun when "Terapkan filter" is pressed. Widget state is per page, so the
+    # preference is kept in a plain session key that both pages read back.
+    def remember_batch_filters():
+        st.session_state.batch_filters = st.session_state.batch_filters_toggle
 
-    # Genre filter
-    if 'genres' in films_df.columns:
-        all_genres = set()
-        for genres in films_df['genres'].str.split(','):
-            if isinstance(genres, list):
-                all_genres.update([g.strip() for g in genres])
-        selected_genres = st.sidebar.multiselect(
-            "Genre",
-            options=sorted(all_genres),
-            default=[]
-        )
-        if selected_genres:
-            films_df = films_df[films_df['genres'].apply(
-                lambda x: any(genre in str(x) for genre in selected_genres) if pd.notna(x) else False
-            )]
+    batch_filters = st.sidebar.toggle("Terapkan filter sekaligus", value=st.session_state.get('batch_filters', False),
+                                      key="batch_filters_toggle", on_change=remember_batch_filters,
+                                      help="Kumpulkan perubahan filter dan jalankan sekali dengan tombol Terapkan")
+    filter_box = st.sidebar.form("film_filters", border=False) if batch_filters else st.sidebar.container()
 
-    # Actors filter
-    if 'actors' in films_df.columns:
-        all_actors = set()
-        for actors in films_df['actors'].str.split(','):
-            if isinstance(actors, list):
-                all_actors.update([a.strip() for a in actors])
-        selected_actors = st.sidebar.multiselect(
-            "Pemeran",
-            options=sorted(all_actors),
-            default=[]
-        )
-        if selected_actors:
-            films_df = films_df[films_df['actors'].apply(
-                lambda x: any(actor in str(x) for actor in selected_actors) if pd.notna(x) else False
-            )]
+    # Options and slider bounds follow the rows left by the filters above them. In
+    # batched mode they come from the search result only, so staged selections are
+    # still valid options when the form is submitted; the mode is therefore one of
+    # their cache inputs.
+    search_result = rows
+    def option_rows():
+        return search_result if batch_filters else rows
 
-    # Directors filter
-    if 'director' in films_df.columns:
-        all_directors = set()
-        for directors in films_df['director'].str.split(','):
-            if isinstance(directors, list):
-                all_directors.update([d.strip() for d in directors])
-        selected_directors = st.sidebar.multiselect(
-            "Sutradara",
-            options=sorted(all_directors),
-            default=[]
-        )
-        if selected_directors:
-            films_df = films_df[films_df['director'].apply(
-                lambda x: any(director in str(x) for director in selected_directors) if pd.notna(x) else False
-            )]
+    # Negara, genre, pemeran, sutradara and penulis filters
+    for column, label in [('country', "Negara"), ('genres', "Genre"), ('actors', "Pemeran"),
+                          ('director', "Sutradara"), ('writer', "Penulis Naskah")]:
+        if column in columns:
+            with timer.span(f"filter:{column}"):
+                if column in ('actors', 'director', 'writer'):
+                    # High-cardinality: top names plus server-side prefix search
+                    selected = facet_picker(label, columns[f'{column}_tokens'], option_rows(), key=f"facet_{column}", cache=cache,
+                                            container=filter_box)
+                else:
+                    selected = filter_box.multiselect(
+                        label,
+                        options=cache.derive(f"options:{column}", (batch_filters,), lambda: facet_options(columns[f'{column}_tokens'], option_rows())),
+                        default=[]
+                    )
+                rows = cache.narrow(f"facet:{column}", tuple(selected), lambda: facet_rows(columns[column], rows, selected))
 
-    # Writers filter
-    if 'writer' in films_df.columns:
-        all_writers = set()
-        for writers in films_df['writer'].str.split(','):
-            if isinstance(writers, list):
-                all_writers.update([w.strip() for w in writers])
-        selected_writers = st.sidebar.multiselect(
-            "Penulis Naskah",
-            options=sorted(all_writers),
-            default=[]
-        )
-        if selected_writers:
-            films_df = films_df[films_df['writer'].apply(
-                lambda x: any(writer in str(x) for writer in selected_writers) if pd.notna(x) else False
-            )]
+    # Provider filter, classified when the catalog was loaded
+    if 'provider' in columns:
+        with timer.span("filter:provider"):
+            present = cache.derive("present:provider", (batch_filters,), lambda: present_values(columns['provider'], option_rows()))
+            selected_providers = filter_box.multiselect(
+                "Platform",
+                options=[p for p in PROVIDER_LABELS if p in present],
+                format_func=PROVIDER_LABELS.get,
+                default=[]
+            )
+            rows = cache.narrow("provider", tuple(selected_providers),
+                                lambda: isin_rows(columns['provider'], rows, selected_providers))
     
-    # Year filter with NaN handling
-    if 'year' in films_df.columns:
-        valid_years = films_df[films_df['year'] != 0]['year']
-        
-        if not valid_years.empty:
-            min_year = int(valid_years.min())
-            max_year = int(valid_years.max())
-            
-            if min_year == max_year:
-                min_year = max(1900, min_year - 1)
-                max_year = min(2100, max_year + 1)
+    # Year filter with NaN handling (year 0 = unknown, always kept)
+    if 'year' in columns:
+        with timer.span("filter:year"):
+            bounds = cache.derive("bounds:year", (batch_filters,), lambda: year_bounds(columns['year'], option_rows()))
             
-            year_range = st.sidebar.slider(
-                "Rentang Tahun",
-                min_value=min_year,
-                max_value=max_year,
-                value=(min_year, max_year)
-            )
+            if bounds is not None:
+                min_year, max_year = bounds
+                
+                if min_year == max_year:
+                    min_year = max(1900, min_year - 1)
+                    max_year = min(2100, max_year + 1)
+                
+                year_range = filter_box.slider(
+                    "Rentang Tahun",
+                    min_value=min_year,
+                    max_value=max_year,
+                    value=(min_year, max_year)
+                )
 
-            films_df = films_df[
-                (films_df['year'] == 0) | 
-                ((films_df['year'] >= year_range[0]) & 
-                (films_df['year'] <= year_range[1]))
-            ]
-        else:
-            st.sidebar.warning("Tidak ada data tahun yang valid untuk difilter")
+                rows = cache.narrow("year", year_range,
+                                    lambda: range_rows(columns['year'], rows, year_range[0], year_range[1], keep_zero=True))
+            else:
+                filter_box.warning("Tidak ada data tahun yang valid untuk difilter")
     
     # Rating filter
-    if 'imdb_rating' in films_df.columns:
-        min_rating = float(films_df['imdb_rating'].min())
-        max_rating = float(films_df['imdb_rating'].max())
-        
-        if min_rating == max_rating:
-            if min_rating > 0:
-                min_rating = max(0.0, min_rating - 0.5)
-                max_rating = min(10.0, max_rating + 0.5)
-            else:
-                min_rating = 0.0
-                max_rating = 1.0
-        
-        rating_range = st.sidebar.slider(
-            "Rentang Rating IMDb",
-            min_value=min_rating,
-            max_value=max_rating,
-            value=(min_rating, max_rating),
-            step=0.1
-        )
-        films_df = films_df[
-            (films_df['imdb_rating'] >= rating_range[0]) & 
-            (films_df['imdb_rating'] <= rating_range[1])
-        ]
+    if 'imdb_rating' in columns and option_rows().size:
+        with timer.span("filter:imdb_rating"):
+            min_rating, max_rating = cache.derive("bounds:imdb_rating", (batch_filters,), lambda: value_bounds(columns['imdb_rating'], option_rows()))
+            
+            if min_rating == max_rating:
+                if min_rating > 0:
+                    min_rating = max(0.0, min_rating - 0.5)
+                    max_rating = min(10.0, max_rating + 0.5)
+                else:
+                    min_rating = 0.0
+                    max_rating = 1.0
+            
+            rating_range = filter_box.slider(
+                "Rentang Rating IMDb",
+                min_value=min_rating,
+                max_value=max_rating,
+                value=(min_rating, max_rating),
+                step=0.1
+            )
+            rows = cache.narrow("imdb_rating", rating_range,
+                                lambda: range_rows(columns['imdb_rating'], rows, rating_range[0], rating_range[1]))
+
+    if batch_filters:
+        filter_box.form_submit_button("✅ Terapkan filter", use_container_width=True)
 
     # Check if no films match filters
-    if len(films_df) == 0:
+    if len(rows) == 0:
         st.warning("Tidak ada film yang sesuai dengan kriteria filter")
         st.stop()
     
     # Pagination
     items_per_page = st.session_state.get('items_per_page', 10)
-    total_pages = max(1, math.ceil(len(films_df) / items_per_page))
+    total_pages = max(1, math.ceil(len(rows) / items_per_page))
     
     # Ensure page_number doesn't exceed total_pages after filtering
     if st.session_state.page_number > total_pages:
@@ -382,69 +380,67 @@ try:
     """, unsafe_allow_html=True)
     
     # Top pagination with items per page selector
-    with pagination_top:
+    with pagination_top, timer.span("pagination_top"):
         col1, col2, col3 = st.columns([0.4, 0.3, 0.3])
         with col1:
-            st.write(f"Menampilkan {len(films_df)} film")
-        with col2:
-            items_options = [10, 15, 20, 25]
-            selected_items = st.selectbox(
-                "Film per halaman",
-                options=items_options,
-                index=items_options.index(items_per_page) if items_per_page in items_options else 0,
-                key="items_per_page_select"
-            )
+            st.write(f"Menampilkan {len(rows)} film")
+            infinite_scroll = st.toggle("Gulir tak terbatas", key="infinite_scroll")
+        if not infinite_scroll:
+            with col2:
+                items_options = [10, 15, 20, 25]
+                selected_items = st.selectbox(
+                    "Film per halaman",
+                    options=items_options,
+                    index=items_options.index(items_per_page) if items_per_page in items_options else 0,
+                    key="items_per_page_select"
+                )
             
-            if selected_items != items_per_page:
-                st.session_state.items_per_page = selected_items
-                st.session_state.page_number = 1
-                st.rerun()
+                if selected_items != items_per_page:
+                    st.session_state.items_per_page = selected_items
+                    st.session_state.page_number = 1
+                    st.rerun()
             
-        with col3:
-            page_input = st.number_input(
-                "Halaman",
-                min_value=1,
-                max_value=total_pages,
-                value=st.session_state.page_number,
-                key="page_input_top"
+            with col3:
+                page_input = st.number_input(
+                    "Halaman",
+                    min_value=1,
+                    max_value=total_pages,
+                    value=st.session_state.page_number,
+                    key="page_input_top"
+                )
+                if page_input != st.session_state.page_number:
+                    st.session_state.page_number = page_input
+                    st.rerun()
+    
+    # Virtualized infinite-scroll grid replaces the number-input pagination
+    if infinite_scroll:
+        # Imported on demand: the first paint uses the paginated grid
+        from infinite_grid import infinite_grid, dataset_token
+        with film_grid, timer.span("grid"):
+            infinite_grid(
+                'film',
+                films_df,
+                rows,
+                dataset_token(catalog.version, rows),
+                lambda film: play_video(film['id'], film['embed_base'], film['title']),
+                key="film_infinite_grid"
             )
-            if page_input != st.session_state.page_number:
-                st.session_state.page_number = page_input
-                st.rerun()
+        report_first_render("film")
+        st.stop()
     
     # Calculate indices for the films to display
     start_idx = (st.session_state.page_number - 1) * items_per_page
-    end_idx = min(start_idx + items_per_page, len(films_df))
-    paged_films = films_df.iloc[start_idx:end_idx]
+    end_idx = min(start_idx + items_per_page, len(rows))
+    paged_films = films_df.iloc[rows[start_idx:end_idx]]
+    data_version = catalog.version
     
     # Display film grid with improved layout and clickable titles
-    with film_grid:
+    with film_grid, timer.span("grid"):
         # Create rows with 5 columns each
         cols_per_row = 5
-        rows = math.ceil(len(paged_films) / cols_per_row)
-        
-        # Dictionary mapping country names to flag emojis
-        country_to_flag = {
-            'USA': '🇺🇸', 'United States': '🇺🇸', 'US': '🇺🇸',
-            'UK': '🇬🇧', 'United Kingdom': '🇬🇧', 'Great Britain': '🇬🇧',
-            'France': '🇫🇷', 'FR': '🇫🇷',
-            'Japan': '🇯🇵', 'JP': '🇯🇵',
-            'Italy': '🇮🇹', 'IT': '🇮🇹',
-            'Germany': '🇩🇪', 'DE': '🇩🇪',
-            'Canada': '🇨🇦', 'CA': '🇨🇦',
-            'China': '🇨🇳', 'CN': '🇨🇳',
-            'Australia': '🇦🇺', 'AU': '🇦🇺',
-            'Spain': '🇪🇸', 'ES': '🇪🇸',
-            'India': '🇮🇳', 'IN': '🇮🇳',
-            'Korea': '🇰🇷', 'South Korea': '🇰🇷', 'KR': '🇰🇷',
-            'Indonesia': '🇮🇩', 'ID': '🇮🇩',
-            'Brazil': '🇧🇷', 'BR': '🇧🇷',
-            'Russia': '🇷🇺', 'RU': '🇷🇺',
-            'Mexico': '🇲🇽', 'MX': '🇲🇽',
-            # Add more countries as needed
-        }
+        grid_rows = math.ceil(len(paged_films) / cols_per_row)
         
-        for row in range(rows):
+        for row in range(grid_rows):
             cols = st.columns(cols_per_row)
             
             for col in range(cols_per_row):
@@ -455,59 +451,13 @@ try:
                         # Get film data with fallbacks
                         film_id = film.get('id', idx)
                         title = film.get('title', 'Judul tidak tersedia')
-                        year = film.get('year', 0)
-                        year_display = year if year != 0 else 'Tidak tersedia'
-                        poster_url = film.get('poster', '')
-                        imdb_rating = film.get('imdb_rating', 'N/A')
-                        plot = film.get('plot_id', 'Deskripsi tidak tersedia')
-                        director = film.get('director', 'Tidak tersedia')
-                        actors = film.get('actors', 'Tidak tersedia')
-                        genres = film.get('genres', 'Tidak tersedia')
-                        writer = film.get('writer', 'Tidak tersedia')
-                        country = film.get('country', 'Tidak tersedia')
-                        embed_url = film.get('embed_url', '')
+                        embed_url = film.get('embed_base', '')
                         
                         # Check if embed URL is available
                         has_video = pd.notna(embed_url) and embed_url != ''
                         
-                        # Process country flag
-                        country_flag = ''
-                        if country != 'Tidak tersedia':
-                            countries = [c.strip() for c in str(country).split(',')]
-                            for c in countries:
-                                if c in country_to_flag:
-                                    country_flag += country_to_flag[c] + ' '
-                        
-                        # Create play button code if embed URL is available
-                        play_button = ''
-                        onclick_attr = ''
-                        title_class = 'film-title'
-                        
-                        if has_video:
-                            play_button = '<div class="play-overlay">▶️</div>'
-                            onclick_attr = f'onclick="document.getElementById(\'play_btn_{film_id}\').click()"'
-                            title_class = 'film-title film-title-link'
-                        
-                        # Create film card with HTML
-                        html = f"""
-                        <div class="film-card">
-                            <div class="poster-container">
-                                {'<img src="' + str(poster_url) + '" class="film-poster" alt="' + title + '" title="' + title + '">' if pd.notna(poster_url) and str(poster_url).startswith('http') else '<div style="text-align: center; color: #888;">Poster tidak tersedia</div>'}
-                            </div>
-                            <div class="film-title" title="{title} ({year_display})">{title} ({year_display})</div>
-                            <div class="film-details">
-                                <div class="film-rating">
-                                    <span>⭐ {imdb_rating}/10</span>
-                                    <span class="country-flag">{country_flag}</span>
-                                </div>
-                                <div><strong>Genre:</strong> {genres}</div>
-                                <div><strong>Sutradara:</strong> {director}</div>
-                                <div><strong>Pemeran:</strong> {actors}</div>
-                                <div><strong>Penulis:</strong> {writer}</div>
-                            </div>
-                        </div>
-                        """
-                        st.markdown(html, unsafe_allow_html=True)
+                        # Film card HTML, prebuilt in the background when this page was prefetched
+                        st.markdown(card_html('film', data_version, film_id, film), unsafe_allow_html=True)
                         
                         # Hidden button to handle the click event
                         if has_video:
@@ -517,11 +467,17 @@ try:
                         
                         # Detail expander with scrollable content
                         with st.expander("Sinopsis"):
+                            plot = catalog.get_text('film', film_id, 'plot_id') or 'Deskripsi tidak tersedia'
                             st.markdown(f'<div class="detail-text">{plot}</div>', unsafe_allow_html=True)
     
+    # Prefetch the next page: build its cards on the background pool and warm the poster cache
+    next_films = films_df.iloc[rows[end_idx:end_idx + items_per_page]]
+    prefetch_page('film', data_version, next_films)
+    st.markdown(image_prefetch_html('film', next_films), unsafe_allow_html=True)
+    
     # Bottom pagination
-    with pagination_bottom:
-        total_items = len(films_df)
+    with pagination_bottom, timer.span("pagination_bottom"):
+        total_items = len(rows)
         showing_start = start_idx + 1
         showing_end = end_idx
         
@@ -553,3 +509,5 @@ try:
 
 except Exception as e:
     st.error(f"Error memproses data: {str(e)}")
+
+report_first_render("film")
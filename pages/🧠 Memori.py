@@ -0,0 +1,102 @@
+import streamlit as st
+from database import arm_reload_trace, get_catalog, get_reload_stats, get_reload_trace_request
+from memory import catalog_memory, deep_sizeof, live_session_states, prefetch_cache_bytes, process_rss, format_bytes
+from profiling import is_admin
+import pandas as pd
+import time
+
+st.set_page_config(
+    page_title="Memori",
+    page_icon="🧠",
+    layout="wide"
+)
+
+# Halaman ini hanya untuk admin (?admin=<SELIRA_ADMIN_TOKEN>)
+if not is_admin():
+    st.error("Halaman ini hanya untuk admin.")
+    st.stop()
+
+st.title("🧠 Memori Worker")
+st.button("🔄 Perbarui")
+
+catalog = get_catalog()
+catalog_df = catalog_memory(catalog)
+heap_bytes = int(catalog_df.loc[catalog_df['penyimpanan'] != "mmap", 'bytes'].sum())
+mapped_bytes = int(catalog_df.loc[catalog_df['penyimpanan'] == "mmap", 'bytes'].sum())
+
+# Process overview
+current_rss, peak_rss = process_rss()
+sessions = live_session_states()
+session_sizes = {session_id: deep_sizeof(state) for session_id, state in (sessions or {}).items()}
+cache_bytes, cache_cards = prefetch_cache_bytes()
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("RSS sekarang", format_bytes(current_rss) if current_rss is not None else "n/a")
+col2.metric("RSS puncak", format_bytes(peak_rss))
+col3.metric(f"Katalog versi {catalog.version}", format_bytes(heap_bytes),
+            help=f"Di heap proses; {format_bytes(mapped_bytes)} lagi di-memory-map (page cache bersama)")
+col4.metric("Sesi aktif", "n/a" if sessions is None else len(sessions))
+
+# Catalog breakdown per column and index structure
+st.subheader("Katalog")
+summary = catalog_df.groupby(['media', 'bagian'], as_index=False)['bytes'].sum().sort_values('bytes', ascending=False)
+summary['ukuran'] = summary['bytes'].map(format_bytes)
+st.dataframe(summary, hide_index=True, use_container_width=True)
+
+with st.expander("Rincian per kolom dan indeks"):
+    details = catalog_df.sort_values('bytes', ascending=False)
+    details['ukuran'] = details['bytes'].map(format_bytes)
+    st.dataframe(details, hide_index=True, use_container_width=True)
+
+# Per-session footprint
+st.subheader("Sesi")
+if sessions is None:
+    st.info("Daftar sesi tidak tersedia (tidak berjalan di server Streamlit).")
+elif session_sizes:
+    sizes = pd.Series(session_sizes)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rata-rata session_state", format_bytes(sizes.mean()))
+    col2.metric("Terbesar", format_bytes(sizes.max()))
+    col3.metric("Cache kartu prefetch", format_bytes(cache_bytes), help=f"{cache_cards} kartu, dipakai bersama semua sesi")
+    st.caption(
+        f"Perkiraan per sesi: {format_bytes(sizes.mean())} state + "
+        f"{format_bytes(cache_bytes / max(1, len(sessions)))} bagian cache prefetch"
+    )
+    st.dataframe(
+        pd.DataFrame({'sesi': sizes.index, 'bytes': sizes.values, 'ukuran': sizes.map(format_bytes).values})
+        .sort_values('bytes', ascending=False),
+        hide_index=True,
+        use_container_width=True
+    )
+
+# Last reload, traced with tracemalloc. Off by default (it slows every allocation in
+# the process), so the admin arms it here for the next reload, or sets SELIRA_TRACE_RELOAD.
+st.subheader("Reload terakhir")
+col1, col2 = st.columns([1, 2])
+with_snapshot = col2.checkbox("Catat lokasi alokasi teratas (lebih lambat)")
+if col1.button("📏 Ukur reload berikutnya"):
+    arm_reload_trace(snapshot=with_snapshot)
+if get_reload_trace_request() is not None:
+    st.caption("Reload berikutnya di proses ini akan diukur dengan tracemalloc.")
+stats = get_reload_stats()
+if stats is None:
+    st.info("Belum ada reload yang diukur di proses ini (aktifkan di atas atau dengan SELIRA_TRACE_RELOAD=1).")
+else:
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Alokasi puncak", format_bytes(stats['peak_bytes']))
+    col2.metric("Tersisa setelah reload", format_bytes(stats['retained_bytes']))
+    col3.metric("Durasi", f"{stats['seconds']:.2f} dtk")
+    st.caption(
+        f"Katalog versi {stats['version']}, selesai "
+        f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stats['finished_at']))}. "
+        "tracemalloc mencatat semua thread, rerun yang berjalan bersamaan ikut terhitung."
+    )
+    if stats['top_retained']:
+        st.dataframe(
+            pd.DataFrame(
+                [(line, size, format_bytes(size)) for line, size in stats['top_retained']],
+                columns=['lokasi', 'bytes', 'ukuran']
+            ),
+            hide_index=True,
+            use_container_width=True
+        )
@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from cards import CARD_BUILDERS, image_url
+
+# Small pool so background work can never starve interactive reruns
+MAX_WORKERS = 2
+MAX_PENDING = 4
+MAX_CACHED_CARDS = 2000
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="prefetch")
+_pending = threading.BoundedSemaphore(MAX_PENDING)
+_lock = threading.Lock()
+_card_cache = OrderedDict()
+
+def _cache_get(key):
+    with _lock:
+        html = _card_cache.get(key)
+        if html is not None:
+            _card_cache.move_to_end(key)
+        return html
+
+def _cache_put(key, html):
+    with _lock:
+        _card_cache[key] = html
+        _card_cache.move_to_end(key)
+        while len(_card_cache) > MAX_CACHED_CARDS:
+            _card_cache.popitem(last=False)
+
+# Function to get the HTML of a card, building and caching it if needed
+def card_html(media, version, card_id, row):
+    key = (media, version, card_id)
+    html = _cache_get(key)
+    if html is None:
+        build_card, _ = CARD_BUILDERS[media]
+        html = build_card(row)
+        _cache_put(key, html)
+    return html
+
+def _build_cards(media, version, rows):
+    try:
+        for card_id, row in rows:
+            card_html(media, version, card_id, row)
+    finally:
+        _pending.release()
+
+# Function to build the cards of the next page on the background pool
+def prefetch_page(media, version, page_df):
+    if page_df.empty:
+        return
+    rows = [(row.get('id', idx), row) for idx, row in page_df.iterrows()]
+    rows = [(card_id, row) for card_id, row in rows if _cache_get((media, version, card_id)) is None]
+    if not rows:
+        return
+    # Skip instead of queueing when the pool is already busy
+    if not _pending.acquire(blocking=False):
+        return
+    try:
+        _executor.submit(_build_cards, media, version, rows)
+    except RuntimeError:
+        _pending.release()
+
+# Function to build hidden images that warm the browser's image cache for the next page
+def image_prefetch_html(media, page_df):
+    _, image_column = CARD_BUILDERS[media]
+    if image_column not in page_df.columns:
+        return ''
+    urls = [url for url in (image_url(u) for u in page_df[image_column]) if url]
+    if not urls:
+        return ''
+    images = ''.join(f'<img src="{url}" loading="eager" alt="">' for url in urls)
+    return f'<div style="display:none" aria-hidden="true">{images}</div>'
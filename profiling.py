@@ -0,0 +1,118 @@
+import cProfile
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Profiling on demand for one session. An admin (URL ?admin=<SELIRA_ADMIN_TOKEN>)
+# arms it from the sidebar; the next N reruns of a page script then run under
+# cProfile and/or a sampling profiler. Each rerun writes
+#   <dir>/<time>-<ms>-<page>-<session>.prof        cProfile stats (pstats, snakeviz)
+#   <dir>/<time>-<ms>-<page>-<session>.collapsed   "frame;frame;frame count" lines for flamegraph.pl / speedscope
+# and only the newest PROFILE_KEEP files of each kind are kept.
+
+ADMIN_TOKEN_ENV = "SELIRA_ADMIN_TOKEN"
+PROFILE_DIR = Path(os.environ.get("SELIRA_PROFILE_DIR", Path(tempfile.gettempdir()) / "selira-profiles"))
+PROFILE_KEEP = int(os.environ.get("SELIRA_PROFILE_KEEP", 20))
+SAMPLE_INTERVAL = 0.005
+
+PROFILE_MODES = {
+    'cprofile': "cProfile + sampling",
+    'sampling': "Sampling saja (overhead kecil)",
+}
+
+_local = threading.local()
+
+def is_admin():
+    token = os.environ.get(ADMIN_TOKEN_ENV)
+    return bool(token) and st.query_params.get("admin") == token
+
+# Sampler: reads the script thread's stack every SAMPLE_INTERVAL seconds
+class _Sampler(threading.Thread):
+    def __init__(self, thread_id):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+def _prune():
+    for suffix in (".prof", ".collapsed"):
+        files = sorted(PROFILE_DIR.glob(f"*{suffix}"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in files[PROFILE_KEEP:]:
+            path.unlink(missing_ok=True)
+
+def _write(name, profile, sampler):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    if profile is not None:
+        profile.dump_stats(PROFILE_DIR / f"{name}.prof")
+    with open(PROFILE_DIR / f"{name}.collapsed", 'w') as f:
+        for stack, count in sampler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    _prune()
+
+# Function to run this page script under the profiler when profiling is armed for the session.
+# Called first thing in a page with its own __file__: the script is executed again, profiled,
+# and the outer run stops once it is done. Does nothing otherwise.
+def profile_rerun(script_path):
+    request = st.session_state.get('profile_request')
+    if not request or request['remaining'] <= 0 or getattr(_local, 'active', False):
+        return
+    request['remaining'] -= 1
+
+    ctx = get_script_run_ctx()
+    page = Path(script_path).stem.split()[-1].lower()
+    session = "".join(c for c in ctx.session_id if c.isalnum())[:8] if ctx else "nosession"
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{page}-{session}"
+    with open(script_path, encoding='utf-8') as f:
+        code = compile(f.read(), script_path, 'exec')
+
+    sampler = _Sampler(threading.get_ident())
+    profile = cProfile.Profile() if request['mode'] == 'cprofile' else None
+    _local.active = True
+    sampler.start()
+    try:
+        if profile is not None:
+            profile.enable()
+        try:
+            exec(code, {'__name__': '__main__', '__file__': script_path})
+        finally:
+            if profile is not None:
+                profile.disable()
+            sampler.done.set()
+            sampler.join()
+            _write(name, profile, sampler)
+    finally:
+        _local.active = False
+    # The profiled copy has rendered the page; skip the rest of the unprofiled one
+    st.stop()
+
+# Admin sidebar panel to arm profiling for the next N reruns of this session
+def profiling_panel():
+    if not is_admin():
+        return
+    with st.sidebar.expander("🛠️ Profiling"):
+        request = st.session_state.get('profile_request')
+        if request and request['remaining'] > 0:
+            st.caption(f"{request['remaining']} rerun lagi akan diprofilkan")
+        mode = st.selectbox("Profiler", options=list(PROFILE_MODES), format_func=PROFILE_MODES.get, key="profile_mode")
+        reruns = st.number_input("Jumlah rerun", min_value=1, max_value=20, value=1, key="profile_reruns")
+        if st.button("Profilkan rerun berikutnya", key="profile_start"):
+            st.session_state.profile_request = {'mode': mode, 'remaining': int(reruns)}
+        st.caption(f"File disimpan di {PROFILE_DIR} (maks. {PROFILE_KEEP} per jenis)")
@@ -0,0 +1,190 @@
+import numpy as np
+import pyarrow.compute as pc
+
+# "Mirip dengan ini": tetangga terdekat tiap item, dihitung sekali saat katalog
+# dibangun. Item dinyatakan sebagai baris matriks sparse item x token (token facet
+# per kolom, mis. "director:Fritz Lang") berbobot IDF, sehingga genre yang umum
+# bernilai kecil dan pemeran/sutradara yang sama bernilai besar; skornya kosinus.
+#
+# Membandingkan semua pasangan tidak mungkin untuk 100k item, jadi kandidat hanya
+# diambil dari token yang jarang (dipakai <= max(MIN_SHARED, n * MAX_SHARED_FRACTION)
+# item), ditambah item dengan himpunan token umum yang sama (mis. kombinasi genre
+# yang sama) supaya item tanpa token jarang tetap punya tetangga. Semua kandidat
+# dinilai dengan kosinus penuh; hanya top-k per item yang disimpan.
+
+FILM_SIMILARITY_COLUMNS = ['genres', 'director', 'writer', 'actors']
+AUDIOBOOK_SIMILARITY_COLUMNS = ['author', 'narrator', 'genres']
+NEIGHBORS = 10
+BLOCK_ROWS = 1024
+MIN_SHARED = 200
+MAX_SHARED_FRACTION = 0.01
+REBUILD_FRACTION = 0.05
+
+# Function to build the normalized item x token matrix from the facet token columns
+def item_token_matrix(columns, fields):
+    # Only needed when a catalog is compiled; workers attached to catalog_store never import scipy
+    from scipy import sparse
+    rows, token_ids = [], []
+    n_items = n_tokens = 0
+    for field in fields:
+        values = columns.get(f'{field}_tokens')
+        if values is None:
+            continue
+        n_items = len(values)
+        lengths = pc.list_value_length(values).fill_null(0).to_numpy(zero_copy_only=False)
+        rows.append(np.repeat(np.arange(len(values), dtype=np.int32), lengths))
+        # One token id range per field, so "director:X" and "writer:X" stay apart
+        encoded = pc.dictionary_encode(pc.list_flatten(values))
+        token_ids.append(encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64) + n_tokens)
+        n_tokens += len(encoded.dictionary)
+    if not rows:
+        return sparse.csr_matrix((n_items, 0), dtype=np.float32)
+    rows = np.concatenate(rows)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, np.concatenate(token_ids))),
+        shape=(n_items, n_tokens)
+    )
+    matrix.data[:] = 1  # a token listed twice for one item still counts once
+
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + n_items) / (1 + document_frequency)).astype(np.float32) + 1
+    matrix = matrix @ sparse.diags(idf)
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix, dtype=np.float32)
+
+# Function to list (item, candidate) pairs of items whose common-token sets are
+# identical: each item gets up to k of the next items in its group, cyclically
+def _group_pairs(common, k):
+    n_items = common.shape[0]
+    signature = common @ np.random.default_rng(0).random(common.shape[1])
+    order = np.argsort(signature, kind='stable')
+    sorted_signature = signature[order]
+    starts = np.flatnonzero(np.r_[True, sorted_signature[1:] != sorted_signature[:-1]])
+    sizes = np.diff(np.r_[starts, n_items])
+    group_start = np.repeat(starts, sizes)
+    group_size = np.repeat(sizes, sizes)
+    offset = np.arange(n_items) - group_start
+    steps = np.arange(1, k + 1)
+    partners = group_start[:, None] + (offset[:, None] + steps) % group_size[:, None]
+    keep = steps[None, :] < group_size[:, None]
+    items = np.broadcast_to(order[:, None], partners.shape)[keep]
+    return items, order[partners[keep]]
+
+def _row_dots(matrix, items, partners):
+    if len(items) == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.asarray(matrix[items].multiply(matrix[partners]).sum(axis=1), dtype=np.float32).ravel()
+
+# Function to split the matrix into its rare and common tokens and list the
+# common-signature group pairs; shared by every block of a build or an update
+def _candidate_index(matrix, k):
+    n_items = matrix.shape[0]
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    rare_tokens = document_frequency <= max(MIN_SHARED, n_items * MAX_SHARED_FRACTION)
+    common = matrix[:, ~rare_tokens].tocsr()
+    group_items, group_partners = _group_pairs(common, k)
+    group_order = np.argsort(group_items, kind='stable')
+    rare = matrix[:, rare_tokens].tocsr()
+    return {
+        'rare': rare,
+        'rare_transposed': rare.T.tocsr(),
+        'common': common,
+        'group_items': group_items[group_order],
+        'group_partners': group_partners[group_order],
+    }
+
+# Function to score every candidate of the given items (sorted positions): returns
+# (items, partners, scores) for each distinct pair, self-pairs excluded
+def _candidate_scores(index, block):
+    n_items = index['rare'].shape[0]
+    # Candidates sharing a rare token; the product already holds their rare-token score
+    shared = (index['rare'][block] @ index['rare_transposed']).tocoo()
+    group_items = index['group_items']
+    # Group pairs of the block: the slots low[i]:high[i] of every item, concatenated
+    low = np.searchsorted(group_items, block)
+    counts = np.searchsorted(group_items, block, side='right') - low
+    group_slots = np.repeat(low - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    items = np.concatenate([block[shared.row].astype(np.int64), group_items[group_slots]])
+    partners = np.concatenate([shared.col, index['group_partners'][group_slots]])
+    rare_scores = np.concatenate([shared.data, np.zeros(len(group_slots), dtype=np.float32)])
+    _, first = np.unique(items * n_items + partners, return_index=True)
+    first = first[items[first] != partners[first]]  # an item is not similar to itself
+    items, partners = items[first], partners[first]
+    return items, partners, rare_scores[first] + _row_dots(index['common'], items, partners)
+
+# Function to write the k best (item, partner, score) triples of each item into its row
+def _keep_top_k(neighbors, scores, items, partners, pair_scores):
+    k = neighbors.shape[1]
+    order = np.lexsort((-pair_scores, items))
+    items, partners, pair_scores = items[order], partners[order], pair_scores[order]
+    row_start = np.searchsorted(items, items)
+    rank = np.arange(len(items)) - row_start
+    keep = (rank < k) & (pair_scores > 0)
+    neighbors[items[keep], rank[keep]] = partners[keep]
+    scores[items[keep], rank[keep]] = pair_scores[keep]
+
+# Function to recompute the full neighbor rows of the given items (sorted positions)
+def _score_rows(index, neighbors, scores, rows):
+    for start in range(0, len(rows), BLOCK_ROWS):
+        block = rows[start:start + BLOCK_ROWS]
+        neighbors[block] = -1
+        scores[block] = 0
+        _keep_top_k(neighbors, scores, *_candidate_scores(index, block))
+
+# Function to precompute the top-k neighbors of every item: (positions, scores),
+# both shaped (items, k); missing neighbors are -1 with score 0
+def build_neighbors(columns, fields, k=NEIGHBORS):
+    matrix = item_token_matrix(columns, fields)
+    n_items = matrix.shape[0]
+    neighbors = np.full((n_items, k), -1, dtype=np.int32)
+    scores = np.zeros((n_items, k), dtype=np.float32)
+    if n_items < 2 or matrix.shape[1] == 0:
+        return neighbors, scores
+    _score_rows(_candidate_index(matrix, k), neighbors, scores, np.arange(n_items))
+    return neighbors, scores
+
+# Function to carry the neighbors of a previous build over to an updated catalog.
+# `source` maps each new row to its old position, or to >= len(old) for a changed or
+# new row (see database._diff_sheet). Only the changed rows and the rows that listed a
+# removed or changed row are scored again; the changed rows are then merged into the
+# lists of the rows they are candidates for. IDF weights of untouched lists stay as they
+# were, so past REBUILD_FRACTION changed rows the neighbors are rebuilt in full.
+def update_neighbors(columns, fields, old_neighbors, old_scores, source, changed, k=NEIGHBORS):
+    n_old, n_items = len(old_neighbors), len(source)
+    if old_neighbors.shape[1:] != (k,) or len(changed) + max(0, n_old - n_items) > n_items * REBUILD_FRACTION:
+        return build_neighbors(columns, fields, k)
+    matrix = item_token_matrix(columns, fields)
+    neighbors = np.full((n_items, k), -1, dtype=np.int32)
+    scores = np.zeros((n_items, k), dtype=np.float32)
+    if n_items < 2 or matrix.shape[1] == 0:
+        return neighbors, scores
+
+    # Old position -> new position of the rows carried over; the extra last slot maps -1 to -1
+    carried = np.flatnonzero(source < n_old)
+    new_position = np.full(n_old + 1, -1, dtype=np.int32)
+    new_position[source[carried]] = carried
+    old_lists = old_neighbors[source[carried]]
+    neighbors[carried] = new_position[old_lists]
+    scores[carried] = np.where(neighbors[carried] >= 0, old_scores[source[carried]], 0)
+    lost = carried[((old_lists >= 0) & (neighbors[carried] < 0)).any(axis=1)]
+
+    index = _candidate_index(matrix, k)
+    rescored = np.union1d(changed, lost).astype(np.int64)
+    _score_rows(index, neighbors, scores, rescored)
+
+    # A changed row can now beat the last neighbor of its candidates (cosine is symmetric)
+    items, partners, pair_scores = _candidate_scores(index, np.sort(np.asarray(changed, dtype=np.int64)))
+    merge = ~np.isin(partners, rescored) & (pair_scores > 0)
+    targets, additions, addition_scores = partners[merge], items[merge], pair_scores[merge]
+    if len(targets):
+        rows = np.unique(targets)
+        current = neighbors[rows]
+        listed = current >= 0
+        _keep_top_k(
+            neighbors, scores,
+            np.concatenate([np.broadcast_to(rows[:, None], current.shape)[listed], targets]),
+            np.concatenate([current[listed], additions]),
+            np.concatenate([scores[rows][listed], addition_scores])
+        )
+    return neighbors, scores
@@ -0,0 +1,47 @@
+import hashlib
+
+import streamlit as st
+
+# Hasil filter per sesi. Rantai pencarian + filter sidebar dijalankan ulang di setiap
+# rerun, padahal ganti halaman, ganti "per halaman" atau buka/tutup pemutar tidak
+# mengubah satu pun input filter. Setiap tahap di sini diberi kunci hash dari versi
+# katalog dan semua input filter sampai tahap itu, jadi tahap dengan input yang sama
+# seperti rerun sebelumnya langsung memakai row id / opsi yang sudah dihitung. Bila
+# satu filter berubah, tahap sebelum filter itu tetap dipakai ulang dan hanya tahap
+# sesudahnya yang dihitung ulang. Hanya hasil dari rerun terakhir yang disimpan.
+
+class FilterCache:
+    def __init__(self, media, version):
+        self.store = st.session_state.setdefault(f'{media}_filter_cache', {})
+        self.version = version
+        self.state = hashlib.blake2b(repr(('catalog', version)).encode(), digest_size=16)
+        self.previous = None
+        self.entries = None
+
+    def _lookup(self, key, compute):
+        if self.entries is None:
+            # The first stage of this rerun swaps in a fresh dict; the previous rerun's
+            # entries stay readable until this rerun has replaced what it needs
+            self.previous = self.store.get('entries', {}) if self.store.get('version') == self.version else {}
+            self.entries = {}
+            self.store['version'] = self.version
+            self.store['entries'] = self.entries
+        if key in self.entries:
+            return self.entries[key]
+        value = self.previous[key] if key in self.previous else compute()
+        self.entries[key] = value
+        return value
+
+    def _key(self, name, inputs):
+        digest = self.state.copy()
+        digest.update(repr((name, inputs)).encode())
+        return digest
+
+    # Function to run a stage that narrows the rows; its inputs become part of the state of every later stage
+    def narrow(self, name, inputs, compute):
+        self.state = self._key(name, inputs)
+        return self._lookup(self.state.hexdigest(), compute)
+
+    # Function to cache a value derived from the current rows (widget options, ranges) without changing the state
+    def derive(self, name, inputs, compute):
+        return self._lookup(self._key(name, inputs).hexdigest(), compute)
@@ -0,0 +1,57 @@
+import time
+
+BOOT_STARTED = time.time()
+
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Start the Streamlit server with a warm process:
+#
+#   python serve.py [streamlit options, e.g. --server.port 8501]
+#
+# Before the server accepts connections, the catalog is loaded (or compiled, or
+# attached from SELIRA_CATALOG_STORE), all indexes and the Home aggregates are
+# built, the modules every page imports are loaded and the first grid page of
+# cards is rendered into the prefetch cache. The first visitor then only pays for
+# their own rerun. Warm-up time and each page's time to first render are logged
+# through the "selira.timing" logger.
+
+APP_DIR = Path(__file__).parent
+HOME = APP_DIR / "🏠 Home.py"
+FIRST_PAGE_CARDS = 10
+
+logger = logging.getLogger("selira.timing")
+
+def warm_up():
+    start = time.perf_counter()
+    import database
+    import filters, cards, prefetch, profiling, facet_picker, result_cache, infinite_grid, audio_player  # noqa: F401 (imported by the pages)
+
+    catalog = database.get_catalog()
+    catalog.aggregates
+    catalog.search_index
+    for media, frame in (('film', catalog.films), ('audiobook', catalog.audiobooks)):
+        for idx, row in frame.head(FIRST_PAGE_CARDS).iterrows():
+            prefetch.card_html(media, catalog.version, row.get('id', idx), row)
+    return catalog, time.perf_counter() - start
+
+def main():
+    import timing
+    catalog, warm_up_s = warm_up()
+    timing.mark_boot(BOOT_STARTED, round(warm_up_s, 3))
+    logger.info(json.dumps({
+        'event': 'warm_up',
+        'seconds': round(warm_up_s, 3),
+        'catalog_version': catalog.version,
+        'films': len(catalog.films),
+        'audiobooks': len(catalog.audiobooks),
+    }))
+
+    from streamlit.web import cli
+    sys.argv = ["streamlit", "run", str(HOME), *sys.argv[1:]]
+    sys.exit(cli.main())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import pandas as pd
+
+# Pembaca satu sheet workbook, dijalankan di pool proses oleh database.load_excel_data.
+# Modul ini sengaja tidak mengimpor streamlit supaya worker pool cepat dimulai.
+
+# Kemungkinan nama sheet per jenis data, urut prioritas
+SHEET_NAMES = {
+    'films': ['films', 'Films', 'film', 'Film', 'Sheet1'],
+    'audiobooks': ['audiobooks'],
+}
+
+def read_sheet(path, kind):
+    excel_data = pd.ExcelFile(path)
+    for sheet in SHEET_NAMES[kind]:
+        if sheet in excel_data.sheet_names:
+            df = pd.read_excel(excel_data, sheet)
+            # Hapus kolom 'error' jika ada
+            if kind == 'films' and 'error' in df.columns:
+                df = df.drop(columns=['error'])
+            return df
+    return pd.DataFrame()
@@ -0,0 +1,48 @@
+import http.client
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+import api
+
+@pytest.fixture(scope="module")
+def server():
+    server = api.CatalogServer(("127.0.0.1", 0), api.CatalogHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+def _get(address, path, **headers):
+    connection = http.client.HTTPConnection(*address, timeout=30)
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response
+
+def test_matching_etag_gets_304(server):
+    etag = _get(server, "/v1/search?q=a").getheader("ETag")
+    assert _get(server, "/v1/search?q=a", **{"If-None-Match": etag}).status == 304
+    assert _get(server, "/v1/search?q=a", **{"If-None-Match": f"W/{etag}"}).status == 304
+
+def test_bad_requests_are_validated_before_the_etag(server):
+    etag = _get(server, "/v1/search?q=a").getheader("ETag")
+    assert _get(server, "/v1/tidak-ada", **{"If-None-Match": etag}).status == 404
+    assert _get(server, "/v1/search?page=x", **{"If-None-Match": etag}).status == 400
+    assert _get(server, "/v1/search?page=x", **{"If-None-Match": "*"}).status == 400
+
+def test_gzip_and_identity_bodies_have_different_etags(server):
+    identity = _get(server, "/v1/search?per_page=100")
+    gzipped = _get(server, "/v1/search?per_page=100", **{"Accept-Encoding": "gzip"})
+    assert gzipped.getheader("Content-Encoding") == "gzip"
+    assert identity.getheader("ETag") != gzipped.getheader("ETag")
+    revalidated = _get(server, "/v1/search?per_page=100",
+                       **{"Accept-Encoding": "gzip", "If-None-Match": identity.getheader("ETag")})
+    assert revalidated.status == 200
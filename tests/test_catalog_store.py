@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+import catalog_store
+import database
+from loadtest import synthetic_frames
+
+QUERIES = ["hujan", "malam kota", "ra", "bintang jalan rumah", "tidak ada"]
+
+def _catalog(films=300, audiobooks=80):
+    return database.Catalog(*synthetic_frames(films, audiobooks), 'test', 1)
+
+def _assert_same(catalog, attached):
+    for media in ('film', 'audiobook'):
+        rows = getattr(catalog, f'{media}_rows')
+        stored = getattr(attached, f'{media}_rows')
+        assert len(stored) == len(rows)
+        for row_id, pos in rows.items():
+            assert stored.get(row_id) == pos
+            assert attached.resolve_id(media, str(row_id)) == catalog.resolve_id(media, str(row_id))
+        column = database.LONG_TEXT_COLUMNS[media][0]
+        for row_id in list(rows)[::17]:
+            assert attached.get_text(media, row_id, column) == catalog.get_text(media, row_id, column)
+        assert attached.get_text(media, 'tidak-ada', column) is None
+    for audiobook_id, table in catalog.chapters.items():
+        assert attached.chapters.get(audiobook_id) == table
+    assert attached.chapters.get('tidak-ada', ()) == ()
+    for query in QUERIES:
+        assert attached.chapter_index.search(query, limit=50) == catalog.chapter_index.search(query, limit=50)
+
+def test_attached_catalog_matches_the_published_one(tmp_path):
+    catalog = _catalog()
+    version = catalog_store.publish(catalog, tmp_path)
+    _assert_same(catalog, catalog_store._load(tmp_path, version))
+
+def test_indexes_are_memory_mapped(tmp_path):
+    attached = catalog_store._load(tmp_path, catalog_store.publish(_catalog(), tmp_path))
+    assert isinstance(attached.audiobook_rows.positions, np.memmap)
+    assert isinstance(attached.chapters.seconds, np.memmap)
+    assert isinstance(attached.chapter_index.postings, np.memmap)
+    assert not (tmp_path / f"v{attached.version}" / "indexes.pickle").exists()
+
+def test_updated_catalog_publishes_a_compacted_chapter_index(tmp_path):
+    films, audiobooks = synthetic_frames(300, 80)
+    catalog = database.Catalog(films.copy(), audiobooks.copy(), 'test', 1)
+    # A few removed audiobooks leave dead chapter entries, below the in-process compaction point
+    updated = database.update_catalog(catalog, films.copy(), audiobooks.iloc[3:].reset_index(drop=True).copy(),
+                                      'test2', 2)
+    assert updated.chapter_index.dead > 0
+    _assert_same(updated, catalog_store._load(tmp_path, catalog_store.publish(updated, tmp_path)))
+
+def test_sorted_keys_store_mixed_ids_as_text():
+    keys, order, as_text = database.SortedKeys.build([3, 'b', 1])
+    rows = database.StoredRows(database.SortedKeys(keys, as_text), order)
+    assert as_text
+    assert rows.get(3) == 0 and rows.get('3') == 0 and rows.get('b') == 1 and rows.get(1) == 2
+    assert rows.get('x') is None and 2.5 not in rows
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+APP_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+import database
+
+def _normalized(urls):
+    df = pd.DataFrame({'embed_url': urls})
+    database.normalize_embed_urls(df)
+    return df
+
+def test_unrecognized_urls_are_not_audio():
+    df = _normalized(["https://example.com/watch/42", "https://example.com/a/b.MP3?x=1", None])
+    assert df['provider'].tolist()[:2] == ['iframe', 'audio']
+    assert pd.isna(df['provider'].iloc[2])
+    assert df['track_id'].isna().all()
+
+def test_ids_ignore_query_and_fragment():
+    df = _normalized([
+        "https://soundcloud.com/selira/track-1?t=30#comments",
+        "https://open.spotify.com/episode/2F1DnzcmRg2b1K1ExJGRwS?si=abc",
+        "https://youtu.be/dQw4w9WgXcQ?t=3",
+    ])
+    assert df['provider'].tolist() == ['soundcloud', 'spotify', 'youtube']
+    assert df['track_id'].tolist() == ['track-1', 'spotify:episode:2F1DnzcmRg2b1K1ExJGRwS', 'dQw4w9WgXcQ']
+    assert df['embed_base'].iloc[0] == database.SOUNDCLOUD_EMBED_BASE + 'track-1'
@@ -0,0 +1,41 @@
+import re
+import sys
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = Path(__file__).parent.parent
+# The pages import database, filters, ... from the app directory
+sys.path.insert(0, str(APP_DIR))
+
+FILM_PAGE = APP_DIR / "pages" / "🎬 Film.py"
+
+def _picker(at, label):
+    return next(m for m in at.multiselect if m.label == label)
+
+# Options are shown as "Nama (jumlah)"
+def _unselected(picker):
+    values = [re.sub(r" \(\d+\)$", "", option) for option in picker.options]
+    return [value for value in values if value not in picker.value]
+
+def test_facet_picker_keeps_consecutive_selections():
+    at = AppTest.from_file(str(FILM_PAGE), default_timeout=60).run()
+    first, second = _unselected(_picker(at, "Pemeran"))[:2]
+
+    _picker(at, "Pemeran").select(first).run()
+    assert _picker(at, "Pemeran").value == [first]
+
+    _picker(at, "Pemeran").select(second).run()
+    assert not at.exception
+    assert _picker(at, "Pemeran").value == [first, second]
+    assert at.session_state["facet_actors_selected"] == [first, second]
+
+def test_facet_picker_keeps_selection_while_searching():
+    at = AppTest.from_file(str(FILM_PAGE), default_timeout=60).run()
+    first = _unselected(_picker(at, "Pemeran"))[0]
+    _picker(at, "Pemeran").select(first).run()
+
+    at.text_input(key="facet_actors_search").input(first[:2]).run()
+    second = _unselected(_picker(at, "Pemeran"))[0]
+    _picker(at, "Pemeran").select(second).run()
+    assert _picker(at, "Pemeran").value == [first, second]
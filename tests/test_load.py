@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+APP_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+import database
+from sheet_reader import SHEET_NAMES, read_sheet
+
+TASKS = [(str(APP_DIR / "data_hiburan.xlsx"), kind) for kind in SHEET_NAMES]
+
+# Stands in for the process pool and records that it was started
+class RecordingPool:
+    started = []
+
+    def __init__(self, max_workers, mp_context=None):
+        RecordingPool.started.append(max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, function, *iterables):
+        return map(function, *iterables)
+
+@pytest.fixture
+def pool(monkeypatch):
+    RecordingPool.started = []
+    monkeypatch.setattr(database, 'ProcessPoolExecutor', RecordingPool)
+    return RecordingPool.started
+
+def _assert_read(frames):
+    assert len(frames) == len(TASKS)
+    for frame, (path, kind) in zip(frames, TASKS):
+        pd.testing.assert_frame_equal(frame, read_sheet(path, kind))
+
+def test_small_workbooks_are_read_inline(monkeypatch, pool):
+    monkeypatch.setattr(database, 'LOAD_WORKERS', 4)
+    # Both sheets come from one workbook, whose size is counted once
+    monkeypatch.setattr(database, 'PARALLEL_LOAD_BYTES', database._file_size(TASKS[0][0]) + 1)
+    _assert_read(database._read_sheets(TASKS))
+    assert pool == []
+
+def test_large_workbooks_use_the_pool(monkeypatch, pool):
+    monkeypatch.setattr(database, 'LOAD_WORKERS', 4)
+    monkeypatch.setattr(database, 'PARALLEL_LOAD_BYTES', 0)
+    _assert_read(database._read_sheets(TASKS))
+    # Never more workers than sheets
+    assert pool == [len(TASKS)]
+
+def test_one_worker_reads_inline(monkeypatch, pool):
+    monkeypatch.setattr(database, 'LOAD_WORKERS', 1)
+    monkeypatch.setattr(database, 'PARALLEL_LOAD_BYTES', 0)
+    _assert_read(database._read_sheets(TASKS))
+    assert pool == []
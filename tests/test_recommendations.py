@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+import database
+import recommendations
+from loadtest import NAMES, synthetic_frames
+from recommendations import FILM_SIMILARITY_COLUMNS, REBUILD_FRACTION, build_neighbors, update_neighbors
+
+N_FILMS = 400
+
+def _columns(films):
+    return database.build_columns(films, database.FILM_SEARCH_COLUMNS, database.FILM_FACET_COLUMNS)
+
+# Function to edit `count` films in place; returns (columns, source, changed) as update_catalog passes them
+def _edit(films, count):
+    changed = np.arange(count) * 7 % len(films)
+    for pos in changed:
+        films.loc[pos, 'actors'] = f"{NAMES[pos % len(NAMES)]}, Pemeran Baru {pos % 3}"
+    source = np.arange(len(films))
+    source[changed] = len(films) + np.arange(count)
+    return _columns(films), source, changed
+
+def _old():
+    films, _ = synthetic_frames(N_FILMS, 0)
+    return films, build_neighbors(_columns(films), FILM_SIMILARITY_COLUMNS)
+
+def test_update_past_rebuild_fraction_is_a_full_build():
+    films, old = _old()
+    columns, source, changed = _edit(films, int(N_FILMS * REBUILD_FRACTION) + 1)
+    neighbors, scores = update_neighbors(columns, FILM_SIMILARITY_COLUMNS, *old, source, changed)
+    expected_neighbors, expected_scores = build_neighbors(columns, FILM_SIMILARITY_COLUMNS)
+    np.testing.assert_array_equal(neighbors, expected_neighbors)
+    np.testing.assert_array_equal(scores, expected_scores)
+
+def test_update_up_to_rebuild_fraction_is_incremental(monkeypatch):
+    films, old = _old()
+    columns, source, changed = _edit(films, int(N_FILMS * REBUILD_FRACTION))
+    expected_neighbors, expected_scores = build_neighbors(columns, FILM_SIMILARITY_COLUMNS)
+
+    def no_build(*args, **kwargs):
+        raise AssertionError("full build")
+    monkeypatch.setattr(recommendations, 'build_neighbors', no_build)
+    neighbors, scores = update_neighbors(columns, FILM_SIMILARITY_COLUMNS, *old, source, changed)
+
+    # Changed rows are scored against the current catalog, exactly like a full build
+    np.testing.assert_array_equal(neighbors[changed], expected_neighbors[changed])
+    np.testing.assert_allclose(scores[changed], expected_scores[changed], rtol=1e-6)
+    # Every list stays well formed: no self links, filled lists first, best first
+    rows = np.arange(N_FILMS)[:, None]
+    assert not (neighbors == rows).any()
+    assert ((neighbors >= 0) == (scores > 0)).all()
+    assert (np.diff(scores, axis=1) <= 1e-6).all()
+    assert not (np.diff((neighbors >= 0).astype(int), axis=1) > 0).any()
+
+def test_update_without_changes_keeps_the_lists():
+    films, old = _old()
+    neighbors, scores = update_neighbors(_columns(films), FILM_SIMILARITY_COLUMNS, *old,
+                                         np.arange(N_FILMS), np.zeros(0, dtype=np.int64))
+    np.testing.assert_array_equal(neighbors, old[0])
+    np.testing.assert_array_equal(scores, old[1])
+
+def test_removed_rows_leave_every_list():
+    films, old = _old()
+    kept = np.setdiff1d(np.arange(N_FILMS), [3, 10])
+    films = films.iloc[kept].reset_index(drop=True)
+    neighbors, scores = update_neighbors(_columns(films), FILM_SIMILARITY_COLUMNS, *old, kept,
+                                         np.zeros(0, dtype=np.int64))
+    assert neighbors.shape == (len(kept), old[0].shape[1])
+    # Lists without a removed film are carried over through the new positions; the others are scored again
+    carried = old[0][kept]
+    intact = (np.isin(carried, kept) | (carried < 0)).all(axis=1)
+    assert intact.any() and not intact.all()
+    np.testing.assert_array_equal(np.where(neighbors[intact] >= 0, kept[neighbors[intact]], -1), carried[intact])
+    assert (scores[~intact, 0] > 0).all()
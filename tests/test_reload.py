@@ -0,0 +1,129 @@
+import sys
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+APP_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+import database
+from loadtest import synthetic_frames
+
+QUERIES = ["hujan", "malam kota", "ra", "bintang jalan", "a"]
+
+def _frames(films=200, audiobooks=60, seed=0):
+    return synthetic_frames(films, audiobooks, seed)
+
+def _reload(catalog, films, audiobooks):
+    # A fallback to a full build would make the comparison with a rebuild meaningless
+    with mock.patch.object(database.Catalog, '__init__', side_effect=AssertionError("full build")):
+        return database.update_catalog(catalog, films.copy(), audiobooks.copy(), catalog.source_version + 1,
+                                       catalog.version + 1)
+
+# Function to check that an incrementally reloaded catalog holds what a full build of the same sheets holds
+def _assert_same_as_rebuild(updated, films, audiobooks):
+    rebuilt = database.Catalog(films.copy(), audiobooks.copy(), updated.source_version, updated.version)
+    for media, frame in (('film', 'films'), ('audiobook', 'audiobooks')):
+        pd.testing.assert_frame_equal(getattr(updated, frame), getattr(rebuilt, frame))
+        assert getattr(updated, f'{media}_rows') == getattr(rebuilt, f'{media}_rows')
+        np.testing.assert_array_equal(getattr(updated, f'{media}_hashes'), getattr(rebuilt, f'{media}_hashes'))
+        columns, expected = getattr(updated, f'{media}_columns'), getattr(rebuilt, f'{media}_columns')
+        assert columns.keys() == expected.keys()
+        for name, values in expected.items():
+            if isinstance(values, np.ndarray):
+                np.testing.assert_array_equal(columns[name], values)
+            else:
+                assert pa.array(columns[name]).equals(values), name
+        texts, expected_texts = getattr(updated, f'{media}_texts'), getattr(rebuilt, f'{media}_texts')
+        for column in database.LONG_TEXT_COLUMNS[media]:
+            for pos in range(len(getattr(rebuilt, frame))):
+                assert texts.get(pos, column) == expected_texts.get(pos, column)
+    assert updated.chapters == rebuilt.chapters
+    for query in QUERIES:
+        assert sorted(updated.chapter_index.search(query, limit=10 ** 6)) == \
+            sorted(rebuilt.chapter_index.search(query, limit=10 ** 6))
+
+def test_reload_with_edits_equals_rebuild():
+    films, audiobooks = _frames()
+    catalog = database.Catalog(films.copy(), audiobooks.copy(), 1, 1)
+    films.loc[5, 'title'] = "Judul Baru"
+    films.loc[7, 'plot_id'] = "Sinopsis yang diubah."
+    audiobooks.loc[3, 'timestamp'] = "00:00:00 Pembuka 00:10:00 Bab Baru"
+    audiobooks.loc[4, 'description'] = None
+    _assert_same_as_rebuild(_reload(catalog, films, audiobooks), films, audiobooks)
+
+def test_reload_with_added_and_removed_rows_equals_rebuild():
+    films, audiobooks = _frames()
+    catalog = database.Catalog(films.copy(), audiobooks.copy(), 1, 1)
+    more_films, more_audiobooks = _frames(5, 5, seed=1)
+    more_audiobooks['id'] = [f"baru{i}" for i in range(5)]
+    # The film sheet has no id column: its rows are matched by position
+    films = pd.concat([films.iloc[:150], more_films], ignore_index=True)
+    audiobooks = pd.concat([audiobooks.drop(index=[2, 30, 31]), more_audiobooks], ignore_index=True)
+    assert 'id' not in films.columns
+    _assert_same_as_rebuild(_reload(catalog, films, audiobooks), films, audiobooks)
+
+def test_reload_with_reordered_rows_equals_rebuild():
+    films, audiobooks = _frames()
+    catalog = database.Catalog(films.copy(), audiobooks.copy(), 1, 1)
+    audiobooks = audiobooks.iloc[::-1].reset_index(drop=True)
+    _assert_same_as_rebuild(_reload(catalog, films, audiobooks), films, audiobooks)
+
+def test_chained_reloads_compact_and_equal_rebuild():
+    films, audiobooks = _frames()
+    catalog = database.Catalog(films.copy(), audiobooks.copy(), 1, 1)
+    compacted = False
+    for step in range(12):
+        rows = range(step * 5, step * 5 + 5)
+        films.loc[rows, 'plot_id'] = f"Sinopsis versi {step}."
+        audiobooks.loc[[step % len(audiobooks)], 'timestamp'] = f"00:00:00 Versi {step} 00:05:00 Akhir"
+        audiobooks.loc[[step % len(audiobooks)], 'description'] = f"Deskripsi versi {step}."
+        previous = catalog
+        catalog = _reload(catalog, films, audiobooks)
+        compacted |= catalog.film_texts.size < previous.film_texts.size
+        _assert_same_as_rebuild(catalog, films, audiobooks)
+    assert compacted
+
+def test_older_text_store_survives_later_updates():
+    films, audiobooks = _frames()
+    first = database.Catalog(films.copy(), audiobooks.copy(), 1, 1)
+    expected = [first.film_texts.get(pos, 'plot_id') for pos in range(len(films))]
+    films.loc[0, 'plot_id'] = "Versi kedua."
+    second = _reload(first, films, audiobooks)
+    # Updating the older version again must not overwrite what the second version appended
+    films.loc[0, 'plot_id'] = "Versi cabang."
+    branch = _reload(first, films, audiobooks)
+    assert [first.film_texts.get(pos, 'plot_id') for pos in range(len(films))] == expected
+    assert second.film_texts.get(0, 'plot_id') == "Versi kedua."
+    assert branch.film_texts.get(0, 'plot_id') == "Versi cabang."
+
+def _chapters(n, prefix="Bab"):
+    return {f"ab{i}": tuple((minute * 60, f"{prefix} {i} menit {minute}", None) for minute in range(0, 30, 10))
+            for i in range(n)}
+
+def test_chapter_index_matches_a_fresh_index_before_and_after_compaction():
+    chapters = _chapters(40)
+    index = database.ChapterIndex(chapters)
+    removed = [f"ab{i}" for i in range(5)]
+    changed = {"ab7": ((0, "Bab tujuh baru", None),), "ab99": ((0, "Bab tambahan", None),)}
+    live = {key: table for key, table in chapters.items() if key not in removed}
+    live.update(changed)
+    partial = index.updated(removed, changed)
+    assert partial.dead > 0
+
+    # Past COMPACT_FRACTION dead entries the update compacts on its own
+    later = [f"ab{i}" for i in range(5, 20)]
+    remaining = {key: table for key, table in live.items() if key not in later}
+    full = partial.updated(later, {})
+    assert full.dead == 0 and full.size == sum(len(table) for table in remaining.values())
+
+    for query in ["bab", "menit 10", "tujuh", "tambahan", "bab 3"]:
+        expected = sorted(database.ChapterIndex(live).search(query, limit=1000))
+        assert sorted(partial.search(query, limit=1000)) == expected
+        assert sorted(partial.compacted().search(query, limit=1000)) == expected
+        assert sorted(full.search(query, limit=1000)) == sorted(database.ChapterIndex(remaining).search(query, limit=1000))
+    # The index that was updated is left as it was
+    assert sorted(index.search("bab", limit=1000)) == sorted(database.ChapterIndex(chapters).search("bab", limit=1000))
@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Span waktu per rerun: muat katalog, pencarian, tiap filter sidebar, paginasi,
+# grid dan pemutar. Aktif dengan SELIRA_TIMING=1 atau parameter URL ?timing=1.
+# Hasilnya tampil di panel sidebar dan dicatat sebagai baris JSON di log.
+TIMING_ENV = "SELIRA_TIMING"
+
+_logger = logging.getLogger("selira.timing")
+if not _logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(_handler)
+    _logger.setLevel(logging.INFO)
+    _logger.propagate = False
+
+def timing_enabled():
+    if os.environ.get(TIMING_ENV, "") not in ("", "0"):
+        return True
+    return st.query_params.get("timing", "") not in ("", "0")
+
+class RerunTimer:
+    def __init__(self, page):
+        ctx = get_script_run_ctx()
+        self.page = page
+        self.session_id = ctx.session_id if ctx else None
+        self.rerun_id = uuid.uuid4().hex[:8]
+        self.started = time.perf_counter()
+        self.spans = []
+        # Placeholder di atas sidebar, diisi ulang setiap kali satu span selesai,
+        # jadi panel tetap lengkap walaupun halaman berhenti lewat st.stop()
+        self.panel = st.sidebar.empty()
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.spans.append((name, elapsed_ms))
+            _logger.info(json.dumps({
+                'event': 'span',
+                'page': self.page,
+                'session_id': self.session_id,
+                'rerun_id': self.rerun_id,
+                'span': name,
+                'ms': round(elapsed_ms, 3),
+            }))
+            self._render()
+
+    def _render(self):
+        total_ms = (time.perf_counter() - self.started) * 1000
+        lines = [f"{name:<24}{elapsed_ms:>9.1f} ms" for name, elapsed_ms in self.spans]
+        lines.append(f"{'total rerun':<24}{total_ms:>9.1f} ms")
+        with self.panel.container():
+            with st.expander("⏱️ Waktu rerun"):
+                st.code("\n".join(lines), language=None)
+
+# Timer nonaktif: span() hanya mengembalikan context manager kosong yang sama
+class _NullTimer:
+    _null = nullcontext()
+
+    def span(self, name):
+        return self._null
+
+NULL_TIMER = _NullTimer()
+
+# Function to start timing the current rerun of a page
+def start_timing(page):
+    return RerunTimer(page) if timing_enabled() else NULL_TIMER
+
+# Start of this process, for the time to first render. serve.py records the real
+# boot time; otherwise fall back to when Linux created the process.
+_boot = {'started': None, 'warm_up_s': None}
+_first_renders = set()
+_first_renders_lock = threading.Lock()
+
+def _process_started():
+    if _boot['started'] is not None:
+        return _boot['started']
+    try:
+        return os.stat(f"/proc/{os.getpid()}").st_ctime
+    except OSError:
+        return None
+
+def mark_boot(started, warm_up_s):
+    _boot['started'] = started
+    _boot['warm_up_s'] = warm_up_s
+
+# Function to log, once per page and process, how long after boot the page first finished rendering
+def report_first_render(page):
+    with _first_renders_lock:
+        if page in _first_renders:
+            return
+        _first_renders.add(page)
+        first_in_process = len(_first_renders) == 1
+    started = _process_started()
+    _logger.info(json.dumps({
+        'event': 'first_render',
+        'page': page,
+        'first_in_process': first_in_process,
+        'seconds_since_boot': None if started is None else round(time.time() - started, 3),
+        'warm_up_s': _boot['warm_up_s'],
+    }))
@@ -1,6 +1,13 @@
 import streamlit as st
+from database import SEARCH_MEDIA, get_catalog
+from filters import ranked_search
+from timing import start_timing, report_first_render
+from profiling import profile_rerun, profiling_panel
+from urllib.parse import quote
 import pandas as pd
-from database import get_films, get_audiobooks
+
+# Profile this rerun instead when an admin armed profiling for the session
+profile_rerun(__file__)
 
 st.set_page_config(
     page_title="Media Collection",
@@ -8,7 +15,12 @@ st.set_page_config(
     layout="wide"
 )
 
+# Timing spans for this rerun (SELIRA_TIMING=1 or ?timing=1), no-ops otherwise
+timer = start_timing("home")
+profiling_panel()
+
 st.title("Selamat Datang di Selira")
+search_query = st.text_input("🔍 Cari film dan audiobook", placeholder="Judul, sutradara, penulis, narator...")
 
 # Apply custom styling
 st.markdown("""
@@ -48,38 +60,51 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Get data for the home page
+# Get data for the home page: the per-version aggregate bundle only, no row-level data
 try:
-    films_df = get_films()
-    audiobooks_df = get_audiobooks()
-    
-    # Handle empty dataframes
-    if films_df.empty:
-        films_count = 0
-        film_previews = []
-    else:
-        films_count = len(films_df)
-        film_previews = films_df.sort_values(by='imdb_rating', ascending=False).head(5) if 'imdb_rating' in films_df.columns else films_df.head(5)
-    
-    if audiobooks_df.empty:
-        audiobooks_count = 0
-        audiobook_previews = []
-    else:
-        audiobooks_count = len(audiobooks_df)
-        audiobook_previews = audiobooks_df.sort_values(by='rating', ascending=False).head(5) if 'rating' in audiobooks_df.columns else audiobooks_df.head(5)
+    with timer.span("load"):
+        catalog = get_catalog()
+        aggregates = catalog.aggregates
+        films_count = aggregates['film_count']
+        audiobooks_count = aggregates['audiobook_count']
     
 except Exception as e:
     st.error(f"Error loading data: {str(e)}")
+    catalog = None
+    aggregates = None
     films_count = 0
     audiobooks_count = 0
-    film_previews = []
-    audiobook_previews = []
+
+SEARCH_LIMIT = 20
+MEDIA_PAGES = {'film': ("🎬", "Film", 'year'), 'audiobook': ("🎧", "Audiobook", 'author')}
+
+# Search across films and audiobooks in the merged index; each result links
+# straight into its page with the player open (?play=<id>)
+if search_query and catalog is not None:
+    with timer.span("search"):
+        index = catalog.search_index
+        hits = ranked_search(index, search_query, SEARCH_LIMIT)
+    if len(hits) == 0:
+        st.info(f"Tidak ada film atau audiobook yang cocok dengan \"{search_query}\".")
+    else:
+        lines = []
+        for hit in hits:
+            media = SEARCH_MEDIA[index['media'][hit]]
+            frame = catalog.films if media == 'film' else catalog.audiobooks
+            item = frame.iloc[index['rows'][hit]]
+            icon, page, detail_column = MEDIA_PAGES[media]
+            detail = item.get(detail_column, '')
+            detail = f" ({detail})" if pd.notna(detail) and detail not in ('', 0) else ''
+            link = f"/{page}?play={quote(str(item['id']), safe='')}"
+            lines.append(f'{icon} <a href="{link}" target="_self"><b>{item["title"]}</b></a>{detail}')
+        st.markdown(f"**{len(hits)} hasil teratas**<br>" + "<br>".join(lines), unsafe_allow_html=True)
+    st.markdown("---")
 
 # Create two columns for the media types
 col1, col2 = st.columns(2)
 
 # Film Section
-with col1:
+with col1, timer.span("film_card"):
     st.markdown(f"""
     <a href="/Film" target="_self">
         <div class="media-card">
@@ -90,7 +115,7 @@ with col1:
     """, unsafe_allow_html=True)
     
 # Audiobook Section
-with col2:
+with col2, timer.span("audiobook_card"):
     st.markdown(f"""
     <a href="/Audiobook" target="_self">
         <div class="media-card">
@@ -99,3 +124,50 @@ with col2:
         </div>
     </a>
     """, unsafe_allow_html=True)
+
+# Function to show a numbered top-rated list from the aggregate bundle
+def top_rated_list(top, rating_column, scale, detail_column):
+    lines = []
+    for rank, item in enumerate(top.itertuples(index=False), start=1):
+        detail = getattr(item, detail_column, '')
+        rating = getattr(item, rating_column)
+        lines.append(f"{rank}. **{item.title}** ({detail}) — ⭐ {rating}/{scale}")
+    st.markdown("\n".join(lines) if lines else "Belum ada data")
+
+# Dashboard
+if aggregates is not None and (films_count or audiobooks_count):
+    with timer.span("dashboard"):
+        st.markdown("---")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Film", films_count)
+        col2.metric("Film bisa ditonton", aggregates['film_playable'])
+        col3.metric("Audiobook", audiobooks_count)
+        col4.metric("Audiobook bisa didengar", aggregates['audiobook_playable'])
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("⭐ Film rating tertinggi")
+            top_rated_list(aggregates['top_films'], 'imdb_rating', 10, 'year')
+        with col2:
+            st.subheader("⭐ Audiobook rating tertinggi")
+            top_rated_list(aggregates['top_audiobooks'], 'goodreads_rating', 5, 'author')
+        
+        # Distributions, already counted when the catalog was loaded
+        distributions = [
+            ("Genre film", 'film_genres'),
+            ("Tahun film", 'film_years'),
+            ("Negara film", 'film_countries'),
+            ("Genre audiobook", 'audiobook_genres'),
+            ("Tahun audiobook", 'audiobook_years'),
+            ("Bahasa audiobook", 'audiobook_languages'),
+        ]
+        tabs = st.tabs([label for label, _ in distributions])
+        for tab, (label, key) in zip(tabs, distributions):
+            with tab:
+                counts = aggregates[key]
+                if counts.empty:
+                    st.info("Belum ada data")
+                else:
+                    st.bar_chart(counts.rename("Jumlah"))
+
+report_first_render("home")